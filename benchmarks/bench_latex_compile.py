@@ -0,0 +1,91 @@
+'''
+-----------------------------------------------------------------------
+File: bench_latex_compile.py
+Description: Benchmark per-render pdflatex time with and without the precompiled preamble format
+-----------------------------------------------------------------------
+'''
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.latex_ops import render_latex
+from src.utils.latex_compiler import LatexCompiler
+
+DEMO_DIR = Path(__file__).resolve().parents[1] / "src" / "demo"
+
+
+def demo_resume() -> dict:
+    """Resume data built from the bundled demo profile"""
+    profile = json.loads((DEMO_DIR / "user_profile.json").read_text(encoding="utf-8"))
+    resume = {
+        "personal": {
+            "full_name": profile.get("full_name", "Jane Doe"),
+            "contact_number": profile.get("contact_number", "+1 555 0100"),
+            "email_address": profile.get("email_address", "jane@example.com"),
+            "github": profile.get("github", "https://github.com/example"),
+            "linkedin": profile.get("linkedin", "https://linkedin.com/in/example"),
+        },
+    }
+    for section in ["work_experience", "projects", "education", "certifications", "achievements"]:
+        if profile.get(section):
+            resume[section] = profile[section]
+    return resume
+
+
+def bench(compiler: LatexCompiler, tex_source: str, out_dir: Path, repeat: int) -> list:
+    """Seconds per render for `repeat` sequential compiles"""
+    seconds = []
+    for i in range(repeat):
+        result = compiler.compile(tex_source, str(out_dir / f"render_{i}.pdf"))
+        assert result.pdf_path, "compile failed"
+        seconds.append(result.seconds)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LaTeX compile time with a precompiled preamble format")
+    parser.add_argument("--repeat", type=int, default=10, help="Renders per configuration")
+    parser.add_argument("--engine", default="pdflatex", help="LaTeX binary")
+    args = parser.parse_args()
+
+    if shutil.which(args.engine) is None:
+        sys.exit(f"{args.engine} not found on PATH")
+
+    tex_source = render_latex(demo_resume())
+    assert tex_source, "template rendering failed"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        baseline = LatexCompiler(max_workers=1, engine=args.engine, precompile=False)
+        precompiled = LatexCompiler(max_workers=1, engine=args.engine, precompile=True, format_dir=tmp / "formats")
+
+        start = time.perf_counter()
+        warmup = precompiled.compile(tex_source, str(tmp / "warmup.pdf"))
+        build = time.perf_counter() - start
+        if not warmup.precompiled:
+            sys.exit("format could not be built or loaded; see the log output above")
+
+        before = bench(baseline, tex_source, tmp, args.repeat)
+        after = bench(precompiled, tex_source, tmp, args.repeat)
+        assert precompiled.stats["precompiled"] == args.repeat + 1, "some renders fell back to the full preamble"
+
+        print(f"engine: {precompiled.formats.tex_version()}")
+        print(f"first render incl. format build: {build * 1000:.0f} ms")
+        print(f"{'configuration':>14} {'mean ms':>9} {'median ms':>10} {'min ms':>8}")
+        for name, seconds in [("full preamble", before), ("precompiled", after)]:
+            print(f"{name:>14} {statistics.mean(seconds) * 1000:>9.1f} {statistics.median(seconds) * 1000:>10.1f} {min(seconds) * 1000:>8.1f}")
+        print(f"speedup: {statistics.median(before) / statistics.median(after):.2f}x")
+
+        baseline.close()
+        precompiled.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+'''
+-----------------------------------------------------------------------
+File: bench_tokenizer.py
+Description: Parity check and benchmark of the regex tokenizer against NLTK's word_tokenize
+-----------------------------------------------------------------------
+'''
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils import metrics
+
+DEMO_PROFILE = Path(__file__).resolve().parents[1] / "src" / "demo" / "user_profile.json"
+
+
+def check_parity(texts):
+    """Fail loudly if the fast path disagrees with the NLTK reference"""
+    for text in texts:
+        fast = metrics.tokenize_and_stem(text)
+        reference = metrics.tokenize_and_stem_nltk(text)
+        if fast != reference:
+            mismatch = next(i for i, pair in enumerate(zip(fast, reference)) if pair[0] != pair[1]) if fast and reference else 0
+            raise AssertionError(
+                f"Tokenizer mismatch at token {mismatch}: fast={fast[mismatch:mismatch + 5]} nltk={reference[mismatch:mismatch + 5]}"
+            )
+    print(f"Parity OK on {len(texts)} documents")
+
+
+def bench(func, text, repeat):
+    """Best-of-three average seconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(text)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark metrics tokenization")
+    parser.add_argument("--profile", type=str, default=str(DEMO_PROFILE), help="JSON profile to tokenize")
+    parser.add_argument("--repeat", type=int, default=50, help="Calls per timing run")
+    args = parser.parse_args()
+
+    with open(args.profile, "r") as file:
+        profile = json.load(file)
+
+    text = json.dumps(profile)
+    edge_cases = "I don't know. John's CI/CD, C++ & Python (3.11); e-mail: a@b.com -- $1,000 at 10:30... rock'n'roll U.S.A."
+    check_parity([text, json.dumps(profile, indent=2), edge_cases])
+
+    nltk_time = bench(metrics.tokenize_and_stem_nltk, text, args.repeat)
+    fast_time = bench(metrics.tokenize_and_stem, text, args.repeat)
+
+    print(f"Profile: {args.profile} ({len(text)} chars, {len(metrics.tokenize_and_stem(text))} tokens)")
+    print(f"NLTK word_tokenize + stem : {nltk_time * 1000:8.3f} ms")
+    print(f"Regex + stem memo         : {fast_time * 1000:8.3f} ms")
+    print(f"Speedup                   : {nltk_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
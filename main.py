@@ -5,6 +5,7 @@ Description: Testing script for the AdaptiveCV pipeline
 -----------------------------------------------------------------------
 '''
 import os
+import time
 import argparse
 import logging
 import json
@@ -27,6 +28,8 @@ logger = logging.getLogger(__name__)
 
 try:
     from src import AdaptiveCV
+    from src.envs import LLM_BASE_URL
+    from src.utils.cassette import Cassette
     logger.info("Successfully imported AdaptiveCV")
 except ImportError as e:
     logger.error(f"Failed to import AdaptiveCV: {e}")
@@ -89,6 +92,7 @@ def test_full_pipeline(model, job_url, user_data_path):
             logger.info("Pipeline completed successfully!")
             logger.info(f"Generated files: {json.dumps(result['files'], indent=2)}")
             logger.info(f"Metrics: {json.dumps(result['metrics'], indent=2)}")
+            logger.info(f"Timings: {json.dumps(result['timings'], indent=2)}")
         else:
             logger.error(f"Pipeline failed: {result.get('error', 'Unknown error')}")
         return result
@@ -108,17 +112,26 @@ def main():
     parser.add_argument("--test-mode", type=str, default="full", 
                         choices=["full", "user-data", "job-details", "resume", "cover-letter"],
                         help="Test mode to run")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the persistent LLM response and rendered PDF caches")
+    parser.add_argument("--base-url", type=str, default=None, help="OpenAI-compatible API endpoint (e.g. a local fake server)")
+    parser.add_argument("--cassette", type=str, default=None, help="Fixture file to record LLM calls to or replay them from")
+    parser.add_argument("--cassette-mode", type=str, default="replay", choices=Cassette.MODES,
+                        help="Record live calls into the cassette or replay them offline")
     
     args = parser.parse_args()
     
     # Initialize the model
     logger.info(f"Initializing AdaptiveCV with provider: {args.provider}, model: {args.model}")
     try:
+        cassette = Cassette(args.cassette, mode=args.cassette_mode) if args.cassette else None
         model = AdaptiveCV(
             api_key=args.api_key,
             provider=args.provider,
             model=args.model,
-            downloads_dir=args.downloads_dir
+            downloads_dir=args.downloads_dir,
+            use_cache=not args.no_cache,
+            base_url=args.base_url or LLM_BASE_URL,
+            cassette=cassette
         )
         logger.info("AdaptiveCV initialized successfully")
     except Exception as e:
@@ -126,6 +139,7 @@ def main():
         return
     
     # Run the selected test mode
+    start_time = time.perf_counter()
     if args.test_mode == "user-data":
         user_data = test_user_data_extraction(model, args.user_data)
         if user_data:
@@ -157,5 +171,9 @@ def main():
         else:
             logger.error("Tests failed. Check logs for details.")
 
+    logger.info(f"Test mode '{args.test_mode}' took {time.perf_counter() - start_time:.2f}s")
+    if cassette is not None:
+        logger.info(f"Cassette {args.cassette} ({args.cassette_mode}): {cassette.stats}")
+
 if __name__ == "__main__":
     main()
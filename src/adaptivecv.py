@@ -9,11 +9,14 @@ Description: ...
 '''
 import os
 import json
+import time
+import asyncio
 import validators
 import logging
 import functools
 
-from typing import Dict, Tuple, Optional, Union, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Union, Any
 from pathlib import Path
 
 from langchain.prompts import PromptTemplate
@@ -21,13 +24,16 @@ from langchain_core.output_parsers import JsonOutputParser
 
 from src.models.sections import Resume
 from src.utils import utils
-from src.utils.latex_ops import latex_to_pdf
-from src.utils.llm_models import ChatGPT
+from src.utils.latex_ops import latex_to_pdf, alatex_to_pdf
+from src.utils.llm_models import ChatGPT, AsyncChatGPT
+from src.utils.cassette import Cassette, CassetteMissError
+from src.utils.cache import get_llm_cache, get_profile_cache, get_render_cache, make_cache_key, file_sha256
+from src.utils.pipeline import run_stages, arun_stages
 from src.utils.data_processing import read_data_from_url, extract_text
-from src.utils.metrics import jaccard_similarity, overlap_coefficient, cosine_similarity, vector_embedding_similarity
+from src.utils.metrics import TEXT_METRICS, calculate_all_metrics
 from src.prompts.resume_prompt import CV_GENERATOR, RESUME_DETAILS_EXTRACTOR, CV_EXPERT, JOB_DETAILS_EXTRACTOR
 from src.models.jobs import JobData
-from src.envs import DEFAULT_LLM_MODEL, DEFAULT_LLM_PROVIDER, LLM_MAPPING, section_mapping
+from src.envs import DEFAULT_LLM_MODEL, DEFAULT_LLM_PROVIDER, LLM_BASE_URL, LLM_MAPPING, RESUME_SECTIONS, SECTION_MAX_WORKERS, section_mapping
 
 
 # Set up logging
@@ -43,6 +49,9 @@ logger = logging.getLogger(__name__)
 MODULE_DIR = Path(__file__).parent
 DEMO_DATA_PATH = MODULE_DIR / "demo" / "user_profile.json"
 
+# Changes whenever the resume extractor prompt or schema changes, invalidating parsed profiles
+RESUME_EXTRACTOR_VERSION = make_cache_key(RESUME_DETAILS_EXTRACTOR, Resume.model_json_schema())[:16]
+
 
 class AdaptiveCV:
     """
@@ -51,12 +60,19 @@ class AdaptiveCV:
     This model extracts job details from URLs, extracts user data from resumes,
     and generates tailored resumes and cover letters based on job descriptions.
 
+    Every public step has an asyncio counterpart prefixed with `a` (e.g. aresume_cv_pipeline)
+    that awaits an AsyncOpenAI client and runs blocking file, PDF and web work in threads.
+
     Args:
         api_key (str, optional): The API key for the LLM provider. Defaults to environment variable.
         downloads_dir (str, optional): The directory to save generated files. Defaults to system downloads folder.
         provider (str, optional): The LLM provider to use. Defaults to DEFAULT_LLM_PROVIDER.
         model (str, optional): The LLM model to use. Defaults to DEFAULT_LLM_MODEL.
         system_prompt (str, optional): Custom system prompt. Defaults to RESUME_WRITER_PERSONA.
+        max_workers (int, optional): Maximum number of resume sections generated concurrently. Defaults to SECTION_MAX_WORKERS.
+        use_cache (bool, optional): Whether to reuse cached LLM responses and compiled PDFs across runs. Defaults to True.
+        base_url (str, optional): OpenAI-compatible API endpoint. Defaults to LLM_BASE_URL (ADAPTIVECV_LLM_BASE_URL).
+        cassette (Cassette, optional): Record/replay fixture for LLM calls and fetched pages. Defaults to None.
     """
 
     def __init__(
@@ -65,17 +81,30 @@ class AdaptiveCV:
         provider: Optional[str] = None,
         model: Optional[str] = None,
         downloads_dir: Optional[str] = None,
-        system_prompt: str = CV_EXPERT
+        system_prompt: str = CV_EXPERT,
+        max_workers: int = SECTION_MAX_WORKERS,
+        use_cache: bool = True,
+        base_url: Optional[str] = LLM_BASE_URL,
+        cassette: Optional[Cassette] = None
     ):
         self.system_prompt = system_prompt
+        self.max_workers = max(1, max_workers)
+        self.use_cache = use_cache
         self.provider = DEFAULT_LLM_PROVIDER if not provider or not provider.strip() else provider
         self.model = DEFAULT_LLM_MODEL if not model or not model.strip() else model
-        self.downloads_dir = utils.get_default_download_folder() if not downloads_dir or not downloads_dir.strip() else downloads_dir
+        self.downloads_dir = utils.get_default_download_folder() if not downloads_dir or not downloads_dir.strip() else os.path.abspath(downloads_dir)
+
+        self.base_url = base_url
+        self.cassette = cassette
 
-        self.api_key = self._get_api_key(api_key)
+        # Local OpenAI-compatible servers accept any key, but the client requires one
+        self.api_key = self._get_api_key(api_key) or ("local" if self.base_url else None)
 
         logger.info(f"Initializing {self.provider} model: {self.model}")
         self.llm = self._get_llm_instance()
+        self._async_llm = None
+        self.profile_cache = get_profile_cache() if self.use_cache else None
+        self.render_cache = get_render_cache() if self.use_cache else None
 
 
     def _get_api_key(self, api_key: Optional[str]) -> Optional[str]:
@@ -91,49 +120,110 @@ class AdaptiveCV:
         return api_key
     
 
-    def _get_llm_instance(self):
+    def _get_llm_instance(self, asynchronous: bool = False):
         """Create and return the appropriate LLM instance based on provider"""
         providers = {
-            "GPT": lambda: ChatGPT(api_key=self.api_key, model=self.model, system_prompt=self.system_prompt), # for now only chatgpt
+            "GPT": (ChatGPT, AsyncChatGPT), # for now only chatgpt
         }
 
         if self.provider not in providers:
             raise ValueError(f"Invalid LLM Provider: {self.provider}. Supported providers: {', '.join(providers.keys())}")
         
-        return providers[self.provider]()
+        llm_class = providers[self.provider][1 if asynchronous else 0]
+        return llm_class(
+            api_key=self.api_key,
+            model=self.model,
+            system_prompt=self.system_prompt,
+            cache=get_llm_cache() if self.use_cache else None,
+            base_url=self.base_url,
+            cassette=self.cassette,
+        )
+
+    @property
+    def async_llm(self):
+        """Async LLM client, created on first use by the `a`-prefixed methods"""
+        if self._async_llm is None:
+            self._async_llm = self._get_llm_instance(asynchronous=True)
+        return self._async_llm
     
 
     def resume_to_json(self, pdf_path: str) -> Dict:
         """
         Converts a resume in PDF format to JSON format.
 
+        Parsed resumes are cached by the SHA-256 of the PDF bytes, the extractor prompt
+        version and the model, so re-uploading the same PDF skips extraction and the LLM call.
+
         Args:
             pdf_path (str): The path to the PDF file.
 
         Returns:
             dict: The resume data in JSON format.
         """
+        cache_key, cached_resume = self._cached_profile(pdf_path)
+        if cached_resume:
+            return cached_resume
+
+        resume_text = self._extract_resume_text(pdf_path)
+
+        logger.info("Parsing resume text to JSON format")
+        resume_json = self.llm.get_response(prompt=self._resume_prompt(resume_text), need_json_output=True)
+        logger.info("Resume Successfully parsed to JSON")
+
+        if cache_key and resume_json:
+            self.profile_cache.set(cache_key, {"resume": resume_json, "text": resume_text})
+
+        return resume_json
+
+    async def aresume_to_json(self, pdf_path: str) -> Dict:
+        """Async version of resume_to_json"""
+        cache_key, cached_resume = await asyncio.to_thread(self._cached_profile, pdf_path)
+        if cached_resume:
+            return cached_resume
+
+        resume_text = await asyncio.to_thread(self._extract_resume_text, pdf_path)
+
+        logger.info("Parsing resume text to JSON format")
+        resume_json = await self.async_llm.get_response(prompt=self._resume_prompt(resume_text), need_json_output=True)
+        logger.info("Resume Successfully parsed to JSON")
+
+        if cache_key and resume_json:
+            await asyncio.to_thread(self.profile_cache.set, cache_key, {"resume": resume_json, "text": resume_text})
+
+        return resume_json
+
+    def _cached_profile(self, pdf_path: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Profile cache key for a PDF and the cached parsed resume, if any"""
+        if self.profile_cache is None:
+            return None, None
+
+        cache_key = make_cache_key(file_sha256(pdf_path), RESUME_EXTRACTOR_VERSION, self.model, self.base_url)
+        cached_profile = self.profile_cache.get(cache_key)
+        if cached_profile:
+            logger.info(f"Using cached parsed resume for: {pdf_path}")
+            return cache_key, cached_profile["resume"]
+        return cache_key, None
+
+    @staticmethod
+    def _extract_resume_text(pdf_path: str) -> str:
         logger.info(f"Extracting text from PDF: {pdf_path}")
         resume_text = extract_text(pdf_path)
 
         if not resume_text:
             logger.error("Failed to extract from PDF")
             raise ValueError("Could not extract text from the provided PDF")
-        
-        logger.info("Parsing resume text to JSON format")
+        return resume_text
+
+    @staticmethod
+    def _resume_prompt(resume_text: str) -> str:
         json_parser = JsonOutputParser(pydantic_object=Resume)
 
-        prompt = PromptTemplate(
+        return PromptTemplate(
             template=RESUME_DETAILS_EXTRACTOR,
             input_variables=["resume_text"],
             partial_variables={"format_instructions": json_parser.get_format_instructions()}
         ).format(resume_text=resume_text)
 
-        resume_json = self.llm.get_response(prompt=prompt, need_json_output=True)
-        logger.info("Resume Successfully parsed to JSON")
-
-        return resume_json
-
     @utils.timer_decoder
     def user_data_extraction(self, user_data_path: Optional[str] = None, is_st: bool = False) -> Dict:
         """
@@ -150,19 +240,38 @@ class AdaptiveCV:
             ValueError: If the file format is invalid or file cannot be processed.
         """
         logger.info("Starting user data extraction")
+        source, user_data_path = self._user_data_source(user_data_path)
+
+        if source == "url":
+            return self._read_user_data_url(user_data_path)
+        elif source == "pdf":
+            return self.resume_to_json(user_data_path)
+        return utils.read_json(user_data_path)
+
+    @utils.timer_decoder
+    async def auser_data_extraction(self, user_data_path: Optional[str] = None, is_st: bool = False) -> Dict:
+        """Async version of user_data_extraction"""
+        logger.info("Starting user data extraction")
+        source, user_data_path = self._user_data_source(user_data_path)
 
+        if source == "url":
+            return await asyncio.to_thread(self._read_user_data_url, user_data_path)
+        elif source == "pdf":
+            return await self.aresume_to_json(user_data_path)
+        return await asyncio.to_thread(utils.read_json, user_data_path)
+
+    @staticmethod
+    def _user_data_source(user_data_path: Optional[str]) -> Tuple[str, str]:
+        """Classify the user data location as "url", "pdf" or "json", defaulting to the demo profile"""
         # Using demo if not data provided
         if not user_data_path:
             user_data_path = str(DEMO_DATA_PATH)
-            logger.info("No user data path provided, using demo data: {user_data_path}")
+            logger.info(f"No user data path provided, using demo data: {user_data_path}")
         
         # Handle URL
         if validators.url(user_data_path):
             logger.info(f"Extracting user data from URL: {user_data_path}")
-            user_data = read_data_from_url([user_data_path])
-            if not user_data:
-                raise ValueError(f"Failed to extract data from URL: {user_data_path}")
-            return user_data
+            return "url", user_data_path
 
         # Handle file
         path = Path(user_data_path)
@@ -173,12 +282,24 @@ class AdaptiveCV:
 
         if extension == '.pdf':
             logger.info(f"Processing PDF resume: {user_data_path}")
-            return self.resume_to_json(user_data_path)
+            return "pdf", user_data_path
         elif extension == '.json':
             logger.info(f"Loading JSON user data: {user_data_path}")
-            return utils.read_json(user_data_path)
+            return "json", user_data_path
         else:
             raise ValueError(f"Unsupported file format: {extension}. Please provide a PDF, JSON file, or URL.")
+
+    def _read_url(self, url: Union[str, List[str]]) -> Optional[str]:
+        """Fetch page text, through the cassette when one is attached"""
+        if self.cassette is not None:
+            return self.cassette.play("web", url, lambda: read_data_from_url(url))
+        return read_data_from_url(url)
+
+    def _read_user_data_url(self, user_data_path: str) -> str:
+        user_data = self._read_url([user_data_path])
+        if not user_data:
+            raise ValueError(f"Failed to extract data from URL: {user_data_path}")
+        return user_data
         
     
     @utils.timer_decoder
@@ -206,7 +327,7 @@ class AdaptiveCV:
         try:
             if url and not job_site_content:
                 logger.info(f"Fetching job content from URL: {url}")
-                job_site_content = read_data_from_url(url)
+                job_site_content = self._read_url(url)
                 if not job_site_content:
                     logger.error(f"Failed to fetch content from URL: {url}")
                     # if is_st:
@@ -216,39 +337,74 @@ class AdaptiveCV:
             
             # Parse job details
             logger.info("Parsing job details from content")
-            json_parser = JsonOutputParser(pydantic_object=JobData)
+            job_details = self.llm.get_response(prompt=self._job_details_prompt(job_site_content), need_json_output=True)
+            return job_details, self._save_job_details(job_details, url)
 
-            prompt = PromptTemplate(
-                template=JOB_DETAILS_EXTRACTOR,
-                input_variables=["job_description"],
-                partial_variables={"format_instructions": json_parser.get_format_instructions()}
-            ).format(job_description=job_site_content)
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            logger.exception(f"Error extracting job details: {str(e)}")
+            # if is_st:
+            #     import streamlit as st
+            #     st.error(f"Error in job details parsing: {str(e)}")
+            return None, None
 
-            job_details = self.llm.get_response(prompt=prompt, need_json_output=True)
-            if not job_details:
-                logger.error("LLM failed to parse job details")
-                raise ValueError("Failed to parse job details from the provided content")
-            
-            if url:
-                job_details["url"] = url
-            
-            # Save job details
-            jd_path = utils.job_doc_name(job_details, self.downloads_dir, "jd")
-            utils.write_json(jd_path, job_details)
-            logger.info(f"Job details saved to: {jd_path}")
+    @utils.timer_decoder
+    async def ajob_details_extraction(self, url: Optional[str] = None, job_site_content: Optional[str] = None, is_st: bool = False) -> Tuple[Optional[Dict], Optional[str]]:
+        """Async version of job_details_extraction"""
+        logger.info("Starting job details extraction")
 
-            # Remove URL from returned dictionary if added earlier
-            if url:
-                job_details.pop('url', None)
+        if not url and not job_site_content:
+            logger.error("No job url or content provided")
+            raise ValueError("Either a job URL or job description content must be provided")
 
-            return job_details, jd_path
+        try:
+            if url and not job_site_content:
+                logger.info(f"Fetching job content from URL: {url}")
+                job_site_content = await asyncio.to_thread(self._read_url, url)
+                if not job_site_content:
+                    logger.error(f"Failed to fetch content from URL: {url}")
+                    raise ValueError(f"Could not fetch job description from URL: {url}")
 
+            logger.info("Parsing job details from content")
+            job_details = await self.async_llm.get_response(prompt=self._job_details_prompt(job_site_content), need_json_output=True)
+            return job_details, await asyncio.to_thread(self._save_job_details, job_details, url)
+
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.exception(f"Error extracting job details: {str(e)}")
-            # if is_st:
-            #     import streamlit as st
-            #     st.error(f"Error in job details parsing: {str(e)}")
             return None, None
+
+    @staticmethod
+    def _job_details_prompt(job_site_content: str) -> str:
+        json_parser = JsonOutputParser(pydantic_object=JobData)
+
+        return PromptTemplate(
+            template=JOB_DETAILS_EXTRACTOR,
+            input_variables=["job_description"],
+            partial_variables={"format_instructions": json_parser.get_format_instructions()}
+        ).format(job_description=job_site_content)
+
+    def _save_job_details(self, job_details: Dict, url: Optional[str]) -> str:
+        """Validate parsed job details and write them (with the source URL) to the downloads folder"""
+        if not job_details:
+            logger.error("LLM failed to parse job details")
+            raise ValueError("Failed to parse job details from the provided content")
+        
+        if url:
+            job_details["url"] = url
+        
+        # Save job details
+        jd_path = utils.job_doc_name(job_details, self.downloads_dir, "jd")
+        utils.write_json(jd_path, job_details)
+        logger.info(f"Job details saved to: {jd_path}")
+
+        # Remove URL from returned dictionary if added earlier
+        if url:
+            job_details.pop('url', None)
+
+        return jd_path
         
     @utils.timer_decoder
     def cover_letter_generator(self, job_details: Dict, user_data: Dict, need_pdf: bool = True, is_st: bool = False) -> Tuple[Optional[str], Optional[str]]:
@@ -268,56 +424,210 @@ class AdaptiveCV:
         logger.info("Starting cover letter generation")
 
         try:
-            # print(type(job_details), job_details)
-            # print(type(user_data), user_data)
-            prompt = PromptTemplate(
-                template=CV_GENERATOR,
-                input_types={
-                    "my_work_information": dict,
-                    "job_description": dict,
-                },
-            )
-            formatted_prompt = prompt.format(
-                job_description=job_details,
-                my_work_information=user_data,
-            )
-            # prompt = PromptTemplate(
-            #     template=CV_GENERATOR,
-            #     input_types=["my_work_information", "job_description"],
-            # ).format(job_description=job_details, my_work_information=user_data)
-
             logger.info("Generating cover letter with LLM")
-            cover_letter = self.llm.get_response(prompt=formatted_prompt, expecting_longer_output=True)
-            if not cover_letter:
-                logger.error("Failed to generate Cover Letter")
-                return None, None
-            
-            cover_letter = utils.clean_text(cover_letter)
-            
-            # Save cover letter as text
-            cv_path = utils.job_doc_name(job_details, self.downloads_dir, "cv")
-            utils.write_file(cv_path, cover_letter)
-            logger.info(f"Cover Letter text saved to: {cv_path}")
-
-            # Generate PDF if needed
-            pdf_path = None
-            if need_pdf:
-                pdf_path = cv_path.replace(".txt", ".pdf")
-                utils.text_to_pdf(cover_letter, pdf_path)
-                logger.info(f"Cover letter PDF generated at: {pdf_path}")
-
-            return cover_letter, pdf_path
+            cover_letter = self.llm.get_response(prompt=self._cover_letter_prompt(job_details, user_data), expecting_longer_output=True)
+            return self._save_cover_letter(cover_letter, job_details, need_pdf)
         
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.exception(f"Error generating cover letter: {str(e)}")
             # if is_st:
             #     import steamlit as st
             #     st.error(f"Error generating cover letter: {str(e)}")
             return None, None
+
+    @utils.timer_decoder
+    async def acover_letter_generator(self, job_details: Dict, user_data: Dict, need_pdf: bool = True, is_st: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        """Async version of cover_letter_generator"""
+        logger.info("Starting cover letter generation")
+
+        try:
+            logger.info("Generating cover letter with LLM")
+            cover_letter = await self.async_llm.get_response(prompt=self._cover_letter_prompt(job_details, user_data), expecting_longer_output=True)
+            return await asyncio.to_thread(self._save_cover_letter, cover_letter, job_details, need_pdf)
+
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            logger.exception(f"Error generating cover letter: {str(e)}")
+            return None, None
+
+    @staticmethod
+    def _cover_letter_prompt(job_details: Dict, user_data: Dict) -> str:
+        prompt = PromptTemplate(
+            template=CV_GENERATOR,
+            input_types={
+                "my_work_information": dict,
+                "job_description": dict,
+            },
+        )
+        return prompt.format(
+            job_description=job_details,
+            my_work_information=user_data,
+        )
+
+    def _save_cover_letter(self, cover_letter: str, job_details: Dict, need_pdf: bool) -> Tuple[Optional[str], Optional[str]]:
+        """Clean the generated cover letter and write it as text and, optionally, PDF"""
+        if not cover_letter:
+            logger.error("Failed to generate Cover Letter")
+            return None, None
+        
+        cover_letter = utils.clean_text(cover_letter)
+
+        # Save cover letter as text
+        cv_path = utils.job_doc_name(job_details, self.downloads_dir, "cv")
+        utils.write_file(cv_path, cover_letter)
+        logger.info(f"Cover Letter text saved to: {cv_path}")
+
+        # Generate PDF if needed
+        pdf_path = None
+        if need_pdf:
+            pdf_path = cv_path.replace(".txt", ".pdf")
+            utils.text_to_pdf(cover_letter, pdf_path)
+            logger.info(f"Cover letter PDF generated at: {pdf_path}")
+
+        return cover_letter, pdf_path
         
     
+    def _build_section(self, section: str, job_description_str: str, user_data: Dict) -> Optional[Any]:
+        """
+        Generates a single resume section tailored to the job description.
+
+        Args:
+            section (str): Section name, a key of section_mapping.
+            job_description_str (str): Job details serialized as JSON.
+            user_data (Dict): User's resume or work information.
+
+        Returns:
+            Optional[Any]: Section content ready for resume_details, or None if the LLM returned nothing usable.
+        """
+        logger.info(f"Processing {section.upper()} section")
+
+        # Get LLM Response
+        response = self.llm.get_response(
+            prompt=self._section_prompt(section, job_description_str, user_data),
+            expecting_longer_output=True,
+            need_json_output=True,
+        )
+        return self._section_result(section, response)
+
+    async def _abuild_section(self, section: str, job_description_str: str, user_data: Dict) -> Optional[Any]:
+        """Async version of _build_section"""
+        logger.info(f"Processing {section.upper()} section")
+
+        response = await self.async_llm.get_response(
+            prompt=self._section_prompt(section, job_description_str, user_data),
+            expecting_longer_output=True,
+            need_json_output=True,
+        )
+        return self._section_result(section, response)
+
+    @staticmethod
+    def _section_prompt(section: str, job_description_str: str, user_data: Dict) -> str:
+        # Set up json parser
+        json_parser = JsonOutputParser(pydantic_object=section_mapping[section]["schema"])
+
+        section_data = user_data.get(section, {})
+        section_data_str = json.dumps(section_data, indent=2, ensure_ascii=False)
+
+        # Creating prompt per section
+        return PromptTemplate(
+            template=section_mapping[section]["prompt"],
+            input_variables=["section_data", "job_description"],
+            partial_variables={"format_instructions": json_parser.get_format_instructions()}
+        ).format(
+            section_data=section_data_str,
+            job_description=job_description_str
+        )
+
+    @staticmethod
+    def _section_result(section: str, response: Any) -> Optional[Any]:
+        """Section content ready for resume_details, or None if the LLM returned nothing usable"""
+        if not response or not isinstance(response, dict) or not response.get(section):
+            return None
+
+        if section == "skill_section":
+            skills = []
+            for skill in response['skill_section']:
+                if skill.get('items') and len(skill['items']):
+                    limited_items = skill['items'][:5]
+                    skills.append({
+                        'title': skill['title'],
+                        'items': limited_items
+                    })
+            return skills
+
+        return response[section]
+
+    def _build_sections(self, job_details: Dict, user_data: Dict, concurrent: bool, max_workers: int) -> Dict[str, Any]:
+        """
+        Generates all LLM-backed resume sections, optionally dispatching the prompts concurrently.
+
+        A failing section is logged and skipped so the remaining sections are still returned.
+
+        Returns:
+            Dict[str, Any]: Generated sections keyed by section name, in RESUME_SECTIONS order.
+        """
+        job_description_str = json.dumps(job_details, indent=2, ensure_ascii=False)
+        results = {}
+
+        if concurrent and max_workers > 1:
+            logger.info(f"Generating {len(RESUME_SECTIONS)} sections concurrently (max_workers={max_workers})")
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(RESUME_SECTIONS))) as executor:
+                futures = {
+                    section: executor.submit(self._build_section, section, job_description_str, user_data)
+                    for section in RESUME_SECTIONS
+                }
+            for section, future in futures.items():
+                try:
+                    results[section] = future.result()
+                except CassetteMissError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error generating {section} section: {e}")
+        else:
+            for section in RESUME_SECTIONS:
+                try:
+                    results[section] = self._build_section(section, job_description_str, user_data)
+                except CassetteMissError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error generating {section} section: {e}")
+
+        return {section: results[section] for section in RESUME_SECTIONS if results.get(section)}
+
+    async def _abuild_sections(self, job_details: Dict, user_data: Dict, max_workers: int) -> Dict[str, Any]:
+        """Async version of _build_sections; at most max_workers section prompts are in flight"""
+        job_description_str = json.dumps(job_details, indent=2, ensure_ascii=False)
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def build(section: str) -> Optional[Any]:
+            async with semaphore:
+                return await self._abuild_section(section, job_description_str, user_data)
+
+        responses = await asyncio.gather(*(build(section) for section in RESUME_SECTIONS), return_exceptions=True)
+
+        results = {}
+        for section, response in zip(RESUME_SECTIONS, responses):
+            if isinstance(response, CassetteMissError):
+                raise response
+            if isinstance(response, Exception):
+                logger.error(f"Error generating {section} section: {response}")
+            elif response:
+                results[section] = response
+        return results
+
     @utils.timer_decoder
-    def resume_builder(self, job_details: Dict, user_data: Dict, is_st: bool = False) -> Tuple[str, Dict]:
+    def resume_builder(
+        self,
+        job_details: Dict,
+        user_data: Dict,
+        is_st: bool = False,
+        concurrent: bool = True,
+        max_workers: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Tuple[str, Dict]:
         """
         Builds a tailored resume based on job details and user data.
 
@@ -325,6 +635,9 @@ class AdaptiveCV:
             job_details (Dict): Job description details.
             user_data (Dict): User's resume or work information.
             is_st (bool, optional): Whether Streamlit is being used. Defaults to False.
+            concurrent (bool, optional): Whether to generate sections concurrently. Defaults to True.
+            max_workers (int, optional): Parallelism cap for section generation. Defaults to self.max_workers.
+            timings (Dict, optional): Receives the LaTeX compile's pass count and seconds. Defaults to None.
 
         Returns:
             Tuple[str, Dict]: Path to generated PDF resume and resume details dictionary.
@@ -336,13 +649,7 @@ class AdaptiveCV:
         try:
             # Create personal information section
             logger.info("Processing personal information section")
-            resume_details["personal"] = {
-                "full_name": user_data["full_name"],
-                "contact_number": user_data["contact_number"],
-                "email_address": user_data["email_address"],
-                "github": user_data["media_profiles"]["github"],
-                "linkedin": user_data["media_profiles"]["linkedin"]
-            }
+            resume_details["personal"] = self._personal_section(user_data)
 
             # if is_st:
             #     import streamlit as st
@@ -351,86 +658,89 @@ class AdaptiveCV:
             #     st.write(resume_details)
 
             # Process else sections
-            sections = ['work_experience', 'projects', 'skill_section', 'education', 'certifications', 'achievements']
-            for section in sections:
-                section_log = f"Processing {section.upper()} section"
-                logger.info(section_log)
-
-                # if is_st:
-                #     st.toast(f"Processing Resume's {section.upper()} Section...")
-                
-                # Set up json parser
-                json_parser = JsonOutputParser(pydantic_object=section_mapping[section]["schema"])
-
-                section_data = user_data.get(section, {})
-                # section_data_str = utils.escape_curly_braces(json.dumps(section_data, indent=2, ensure_ascii=False))
-                # job_description_str = utils.escape_curly_braces(json.dumps(job_details, indent=2, ensure_ascii=False))
-                section_data_str = json.dumps(section_data, indent=2, ensure_ascii=False)
-                job_description_str = json.dumps(job_details, indent=2, ensure_ascii=False)
-
-                # Creating prompt per section
-                prompt = PromptTemplate(
-                    template=section_mapping[section]["prompt"],
-                    input_variables=["section_data", "job_description"],
-                    partial_variables={"format_instructions": json_parser.get_format_instructions()}
-                ).format(
-                    section_data=section_data_str,
-                    job_description=job_description_str
-                )
-
-                # Get LLM Response
-                response = self.llm.get_response(
-                    prompt=prompt,
-                    expecting_longer_output=True,
-                    need_json_output=True,
-                )
-
-                if response and isinstance(response, dict):
-                    if section in response and response[section]:
-                        if section == "skill_section":
-                            skills = []
-                            for skill in response['skill_section']:
-                                if skill.get('items') and len(skill['items']):
-                                    limited_items = skill['items'][:5]
-                                    skills.append({
-                                        'title': skill['title'],
-                                        'items': limited_items
-                                    })
-
-                            resume_details[section] = skills
-                        else:
-                            resume_details[section] = response[section]
-                
-                # Display in Streamlit if needed
-                # if is_st:
-                #     st.markdown(f"**{section.upper()} Section**")
-                #     st.write(response)
-            
+            resume_details.update(self._build_sections(
+                job_details,
+                user_data,
+                concurrent=concurrent,
+                max_workers=max_workers or self.max_workers,
+            ))
+
             # Keywords
             resume_details['keywords'] = ", ".join(job_details.get('keywords', []))
 
             # Save resume to JSON
-            resume_path = utils.job_doc_name(job_details, self.downloads_dir, "resume")
-            utils.write_json(resume_path, resume_details)
-            logger.info(f"Resume JSON saved to: {resume_path}")
+            resume_path = self._save_resume_details(job_details, resume_details)
 
             # Generate PDF
             pdf_path = resume_path.replace(".json", ".pdf")
             logger.info(f"Generating PDF resume at: {pdf_path}")
-            latex_to_pdf(resume_details, pdf_path)
+            latex_to_pdf(resume_details, pdf_path, render_cache=self.render_cache, timings=timings)
             logger.info(f"Resume PDF generated at: {pdf_path}")
 
             return pdf_path, resume_details            
 
+        except CassetteMissError:
+            raise
         except Exception as e:
             logging.error(f"Error building resume: {e}")
             # if is_st:
             #     import streamlit as st
             #     st.error(f"Error building resume: {str(e)}")
             return resume_path, resume_details
+
+    @utils.timer_decoder
+    async def aresume_builder(
+        self,
+        job_details: Dict,
+        user_data: Dict,
+        is_st: bool = False,
+        max_workers: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Tuple[str, Dict]:
+        """Async version of resume_builder; sections are always generated concurrently"""
+        logger.info("Starting resume generation")
+        resume_details = {}
+        resume_path = ""
+
+        try:
+            logger.info("Processing personal information section")
+            resume_details["personal"] = self._personal_section(user_data)
+            resume_details.update(await self._abuild_sections(job_details, user_data, max_workers or self.max_workers))
+            resume_details['keywords'] = ", ".join(job_details.get('keywords', []))
+
+            resume_path = await asyncio.to_thread(self._save_resume_details, job_details, resume_details)
+
+            pdf_path = resume_path.replace(".json", ".pdf")
+            logger.info(f"Generating PDF resume at: {pdf_path}")
+            await alatex_to_pdf(resume_details, pdf_path, render_cache=self.render_cache, timings=timings)
+            logger.info(f"Resume PDF generated at: {pdf_path}")
+
+            return pdf_path, resume_details
+
+        except CassetteMissError:
+            raise
+        except Exception as e:
+            logger.error(f"Error building resume: {e}")
+            return resume_path, resume_details
+
+    @staticmethod
+    def _personal_section(user_data: Dict) -> Dict:
+        return {
+            "full_name": user_data["full_name"],
+            "contact_number": user_data["contact_number"],
+            "email_address": user_data["email_address"],
+            "github": user_data["media_profiles"]["github"],
+            "linkedin": user_data["media_profiles"]["linkedin"]
+        }
+
+    def _save_resume_details(self, job_details: Dict, resume_details: Dict) -> str:
+        resume_path = utils.job_doc_name(job_details, self.downloads_dir, "resume")
+        utils.write_json(resume_path, resume_details)
+        logger.info(f"Resume JSON saved to: {resume_path}")
+        return resume_path
     
 
-    def calculate_metrics(self, resume_details: Dict, user_data: Dict, job_details: Dict) -> Dict[str, Dict[str, float]]:
+    def calculate_metrics(self, resume_details: Dict, user_data: Dict, job_details: Dict, use_embeddings: bool = False) -> Dict[str, Dict[str, float]]:
         """
         Calculate similarity metrics between resume, user data, and job details.
         
@@ -438,55 +748,48 @@ class AdaptiveCV:
             resume_details (Dict): Generated resume details
             user_data (Dict): Original user data
             job_details (Dict): Job description details
+            use_embeddings (bool, optional): Whether to add vector_embedding_similarity. Defaults to False.
             
         Returns:
             Dict: Dictionary of metrics with scores
         """
         logger.info("Calculating similarity metrics")
-        metrics = {}
-
-        for metric_name in ['jaccard_similarity', 'overlap_coefficient', 'cosine_similarity']:
-            # jaccard_similarity, overlap_coefficient, cosine_similarity, vector_embedding_similarity
-            logger.info(f"Calculating {metric_name}")
-            metric_func = globals()[metric_name]
-
-            resume_str = json.dumps(resume_details)
-            user_str = json.dumps(user_data)
-            job_str = json.dumps(job_details)
-
 
-            user_personalization = metric_func(resume_str, user_str)
-            job_alignment = metric_func(resume_str, job_str)
-            job_match = metric_func(user_str, job_str)
+        metric_names = TEXT_METRICS + ['vector_embedding_similarity'] if use_embeddings else TEXT_METRICS
+        metrics = calculate_all_metrics(resume_details, user_data, job_details, metrics=metric_names, llm=self.llm)
 
-            metrics[metric_name] = {
-                "user_personalization": user_personalization,
-                "job_alignment": job_alignment,
-                "job_match": job_match
-            }
-
-            logger.info(f"{metric_name} - User Personalization: {user_personalization:.4f}, "
-                        f"Job Alignment: {job_alignment:.4f}, Job Match: {job_match:.4f}")
+        for metric_name, scores in metrics.items():
+            logger.info(f"{metric_name} - User Personalization: {scores['user_personalization']:.4f}, "
+                        f"Job Alignment: {scores['job_alignment']:.4f}, Job Match: {scores['job_match']:.4f}")
                         
         return metrics
 
+    async def acalculate_metrics(self, resume_details: Dict, user_data: Dict, job_details: Dict, use_embeddings: bool = False) -> Dict[str, Dict[str, float]]:
+        """Async version of calculate_metrics; the CPU-bound scoring runs in a worker thread"""
+        return await asyncio.to_thread(self.calculate_metrics, resume_details, user_data, job_details, use_embeddings)
+
 
     def resume_cv_pipeline(self, job_url: str, user_data_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Run the complete Auto Apply Pipeline to generate a resume and cover letter.
 
+        The stages run as a dependency graph: user data and job details are extracted in
+        parallel, then the resume and cover letter are generated in parallel, then metrics.
+
         Args:
             job_url (str): The URL of the job to apply for.
             user_data_path (str, optional): Path to the user profile data file.
 
         Returns:
-            Dict: Results including file paths and metrics.
+            Dict: Results including file paths, metrics and per-stage timings in seconds
+                (plus "latex_passes", the pdflatex passes the resume needed).
         """
         logger.info("Starting AdaptiveCV Pipeline")
         result = {
             "success": False,
             "files": {},
-            "metrics": {}
+            "metrics": {},
+            "timings": {}
         }
 
         # try:
@@ -499,36 +802,49 @@ class AdaptiveCV:
             user_data_path = str(DEMO_DATA_PATH)
             logger.info(f"Using default user data path: {user_data_path}")
 
-        # Extracting user data
-        logger.info("Extracting user data")
-        user_data = self.user_data_extraction(user_data_path)
-        if not user_data:
-            raise ValueError("Failed to extract user data")
-        
-        # Extract job details
-        logger.info(f"Extracting job details from URL: {job_url}")
-        job_details, jd_path = self.job_details_extraction(url=job_url)
-        if not job_details:
-            raise ValueError("Failed to extract job details")
-        
-        result["files"]["job_details"] = jd_path
-
-        # Build resume
-        logger.info("Building tailored resume")
-        resume_path, resume_details = self.resume_builder(job_details, user_data)
-        result["files"]["resume"] = resume_path
+        def extract_user_data(_: Dict) -> Dict:
+            logger.info("Extracting user data")
+            user_data = self.user_data_extraction(user_data_path)
+            if not user_data:
+                raise ValueError("Failed to extract user data")
+            return user_data
 
-        # Generate cover letter
-        logger.info("Generating cover letter")
-        cv_text, cv_path = self.cover_letter_generator(job_details, user_data)
-        result["files"]["cover_letter"] = cv_path
+        def extract_job_details(_: Dict) -> Tuple[Dict, str]:
+            logger.info(f"Extracting job details from URL: {job_url}")
+            job_details, jd_path = self.job_details_extraction(url=job_url)
+            if not job_details:
+                raise ValueError("Failed to extract job details")
+            return job_details, jd_path
 
-        # Calculate metrics
-        metrics = self.calculate_metrics(resume_details, user_data, job_details)
-        result["metrics"] = metrics
+        def build_resume(done: Dict) -> Tuple[str, Dict]:
+            logger.info("Building tailored resume")
+            return self.resume_builder(done["job_details"][0], done["user_data"], timings=render_timings)
+
+        def generate_cover_letter(done: Dict) -> Tuple[Optional[str], Optional[str]]:
+            logger.info("Generating cover letter")
+            return self.cover_letter_generator(done["job_details"][0], done["user_data"])
+
+        def score_resume(done: Dict) -> Dict:
+            return self.calculate_metrics(done["resume"][1], done["user_data"], done["job_details"][0])
+
+        render_timings: Dict[str, float] = {}
+        pipeline_start = time.perf_counter()
+        stages, timings = run_stages({
+            "user_data": (extract_user_data, []),
+            "job_details": (extract_job_details, []),
+            "resume": (build_resume, ["user_data", "job_details"]),
+            "cover_letter": (generate_cover_letter, ["user_data", "job_details"]),
+            "metrics": (score_resume, ["resume", "user_data", "job_details"]),
+        })
+
+        result["files"]["job_details"] = stages["job_details"][1]
+        result["files"]["resume"] = stages["resume"][0]
+        result["files"]["cover_letter"] = stages["cover_letter"][1]
+        result["metrics"] = stages["metrics"]
+        result["timings"] = {**timings, **render_timings, "total": time.perf_counter() - pipeline_start}
 
         result["success"] = True
-        logger.info("Auto Resume and CV Pipeline completed successfully")
+        logger.info(f"Auto Resume and CV Pipeline completed successfully in {result['timings']['total']:.2f}s")
         
         return result
             
@@ -536,3 +852,73 @@ class AdaptiveCV:
         #     logger.error(f"Error in resume CV Pipeline: {str(e)}")
         #     result["error"] = str(e)
         #     return result
+
+    async def aresume_cv_pipeline(self, job_url: str, user_data_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async version of resume_cv_pipeline, with the same stage graph and result layout.
+
+        LLM calls are awaited on the event loop and pdflatex runs on the LatexCompiler's
+        thread pool (awaited through LatexCompiler.acompile), so many pipelines can share
+        one loop without blocking it.
+        """
+        logger.info("Starting AdaptiveCV Pipeline")
+        result = {
+            "success": False,
+            "files": {},
+            "metrics": {},
+            "timings": {}
+        }
+
+        if not job_url or not job_url.strip():
+            logger.error("Job URL is required")
+            raise ValueError("Job URL is required")
+
+        if not user_data_path:
+            user_data_path = str(DEMO_DATA_PATH)
+            logger.info(f"Using default user data path: {user_data_path}")
+
+        async def extract_user_data(_: Dict) -> Dict:
+            logger.info("Extracting user data")
+            user_data = await self.auser_data_extraction(user_data_path)
+            if not user_data:
+                raise ValueError("Failed to extract user data")
+            return user_data
+
+        async def extract_job_details(_: Dict) -> Tuple[Dict, str]:
+            logger.info(f"Extracting job details from URL: {job_url}")
+            job_details, jd_path = await self.ajob_details_extraction(url=job_url)
+            if not job_details:
+                raise ValueError("Failed to extract job details")
+            return job_details, jd_path
+
+        async def build_resume(done: Dict) -> Tuple[str, Dict]:
+            logger.info("Building tailored resume")
+            return await self.aresume_builder(done["job_details"][0], done["user_data"], timings=render_timings)
+
+        async def generate_cover_letter(done: Dict) -> Tuple[Optional[str], Optional[str]]:
+            logger.info("Generating cover letter")
+            return await self.acover_letter_generator(done["job_details"][0], done["user_data"])
+
+        async def score_resume(done: Dict) -> Dict:
+            return await self.acalculate_metrics(done["resume"][1], done["user_data"], done["job_details"][0])
+
+        render_timings: Dict[str, float] = {}
+        pipeline_start = time.perf_counter()
+        stages, timings = await arun_stages({
+            "user_data": (extract_user_data, []),
+            "job_details": (extract_job_details, []),
+            "resume": (build_resume, ["user_data", "job_details"]),
+            "cover_letter": (generate_cover_letter, ["user_data", "job_details"]),
+            "metrics": (score_resume, ["resume", "user_data", "job_details"]),
+        })
+
+        result["files"]["job_details"] = stages["job_details"][1]
+        result["files"]["resume"] = stages["resume"][0]
+        result["files"]["cover_letter"] = stages["cover_letter"][1]
+        result["metrics"] = stages["metrics"]
+        result["timings"] = {**timings, **render_timings, "total": time.perf_counter() - pipeline_start}
+
+        result["success"] = True
+        logger.info(f"Auto Resume and CV Pipeline completed successfully in {result['timings']['total']:.2f}s")
+
+        return result
@@ -6,7 +6,10 @@ Email: u.shernaz4rov@gmail.com
 Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
 ---------------------------------
 '''
+import os
+
 from typing import Dict, Any, List
+from pathlib import Path
 
 from src.prompts.sections_prompt import (
     EXPERIENCE,
@@ -39,9 +42,98 @@ GPT_EMBEDDING_MODEL = EmbeddingModels.GPT
 # GEMINI_EMBEDDING_MODEL = EmbeddingModels.GEMINI
 # OLLAMA_EMBEDDING_MODEL = EmbeddingModels.OLLAMA
 
+# Embedding request batching (tokens are estimated at ~4 characters per token)
+EMBEDDING_BATCH_TOKENS = 50_000
+EMBEDDING_BATCH_SIZE = 2048  # OpenAI limit on inputs per request
+EMBEDDING_MAX_WORKERS = 4
+
 # Default LLM settings
 DEFAULT_LLM_PROVIDER = "GPT"
 DEFAULT_LLM_MODEL = "gpt-4o"
+# OpenAI-compatible endpoint override, e.g. the local stand-in from src/utils/fake_llm_server.py
+LLM_BASE_URL = os.environ.get("ADAPTIVECV_LLM_BASE_URL") or None
+
+# Shared HTTP connection pool for LLM API clients
+LLM_MAX_CONNECTIONS = 64
+LLM_MAX_KEEPALIVE_CONNECTIONS = 32
+LLM_KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection is kept open
+
+# LLM request scheduling: starting limits per model, adjusted from rate-limit response headers
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 200_000
+LLM_DEFAULT_COMPLETION_TOKENS = 1000  # completion estimate when max_tokens is not set
+LLM_MAX_RETRIES = 6
+LLM_BACKOFF_BASE = 1.0  # seconds
+LLM_BACKOFF_MAX = 60.0  # seconds
+
+# Local cache settings
+CACHE_DIR = Path(os.environ.get("ADAPTIVECV_CACHE_DIR", Path.home() / ".cache" / "adaptivecv"))
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+LLM_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+PROFILE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+PROFILE_CACHE_TTL = 90 * 24 * 60 * 60  # 90 days
+RENDER_CACHE_DIR = CACHE_DIR / "renders"  # compiled resume PDFs keyed by content
+RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Web extraction: loaders are tried cheapest first until the content scores at least this
+WEB_CONTENT_SCORE_THRESHOLD = 0.6
+WEB_CONTENT_MIN_SCORE = 0.3  # below this even the best fallback text is discarded (login walls, error pages)
+WEB_STRATEGY_MEMORY_PATH = CACHE_DIR / "web_strategies.json"
+
+# HTTP fetch cache for job pages
+HTTP_CACHE_DIR = CACHE_DIR / "http"
+HTTP_CACHE_FRESHNESS = 60 * 60  # seconds served from cache without revalidation
+HTTP_POOL_SIZE = 16  # keep-alive connections per host
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+HTTP_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # entries unused this long are removed (30 days)
+HTTP_CACHE_SWEEP_INTERVAL = 10 * 60  # seconds between eviction sweeps
+
+# Bulk job page fetching
+FETCH_MAX_WORKERS = 16
+FETCH_PER_HOST_CONCURRENCY = 2
+FETCH_PER_HOST_RPS = 1.0  # requests per second per host
+
+# Shared headless browser for JS-rendered job pages
+BROWSER_POOL_SIZE = 4  # browser contexts, i.e. pages loading at once
+BROWSER_PAGE_TIMEOUT = 30.0  # seconds
+BROWSER_CONTEXT_MAX_PAGES = 50  # recycle a context after this many pages
+
+# PDF text extraction: documents with at least PDF_PROCESS_MIN_PAGES pages are split into
+# PDF_SHARD_PAGES-page ranges and extracted on a process pool
+PDF_PROCESS_MIN_PAGES = 32
+PDF_SHARD_PAGES = 8
+PDF_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# LaTeX compilation: each job compiles in a private temp dir on a bounded worker pool
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+LATEX_MAX_WORKERS = min(4, os.cpu_count() or 1)
+LATEX_TIMEOUT = 60.0  # seconds per pdflatex pass
+LATEX_MAX_OUTPUT_BYTES = 20 * 1024 * 1024  # 20 MB
+LATEX_MAX_PASSES = 4  # reruns stop earlier once .aux references and the log are stable
+# Dumped pdflatex format of the static template preamble, rebuilt when resume.cls, the preamble or TeX changes
+LATEX_PRECOMPILED_FORMAT = os.environ.get("ADAPTIVECV_LATEX_FORMAT", "1") != "0"
+LATEX_FORMAT_DIR = CACHE_DIR / "latex"
+# Template rendering: compiled Jinja templates are cached on disk; debug mode dumps each rendered .tex
+LATEX_BYTECODE_CACHE_DIR = CACHE_DIR / "jinja"
+LATEX_RENDER_DEBUG = os.environ.get("ADAPTIVECV_LATEX_DEBUG", "0") == "1"
+
+# Reference corpus used to fit the TF-IDF model for cosine similarity
+DATASETS_DIR = Path(__file__).resolve().parent.parent / "datasets"
+TFIDF_CORPUS_DIRS: List[Path] = [DATASETS_DIR / "job_postings", DATASETS_DIR / "resumes"]
+TFIDF_MODEL_PATH = CACHE_DIR / "tfidf_model.joblib"
+
+# Resume sections generated by the LLM, in the order they appear in resume_details
+RESUME_SECTIONS: List[str] = [
+    "work_experience",
+    "projects",
+    "skill_section",
+    "education",
+    "certifications",
+    "achievements",
+]
+
+# Maximum number of section prompts in flight at once (1 disables concurrency)
+SECTION_MAX_WORKERS = 6
 
 # LLM provider configuration
 LLM_MAPPING: Dict[str, Dict[str, Any]] = {
@@ -0,0 +1,140 @@
+'''
+---------------------------------
+File: batch_scoring.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import json
+import logging
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.utils.metrics import TEXT_METRICS, tokenize_and_stem
+from src.utils.tfidf import TfidfScorer, get_default_scorer
+
+
+logger = logging.getLogger(__name__)
+
+# Below this many documents a process pool costs more than it saves
+MIN_DOCS_FOR_PROCESSES = 200
+
+
+def _to_text(document: Any) -> str:
+    """Documents may be raw text or JSON-serializable structures"""
+    return document if isinstance(document, str) else json.dumps(document)
+
+
+def _tokenize_shard(texts: List[str]) -> List[List[str]]:
+    """Unique normalized tokens per text (top-level so it can run in worker processes)"""
+    return [list(set(tokenize_and_stem(text))) for text in texts]
+
+
+def tokenize_documents(texts: List[str], n_jobs: int = 1) -> List[List[str]]:
+    """
+    Tokenize documents into unique normalized words, sharded across processes for large inputs.
+
+    Args:
+        texts (List[str]): Documents to tokenize.
+        n_jobs (int, optional): Worker processes, 1 tokenizes in-process. Defaults to 1.
+
+    Returns:
+        List[List[str]]: Unique tokens per document, in input order.
+    """
+    if n_jobs <= 1 or len(texts) < MIN_DOCS_FOR_PROCESSES:
+        return _tokenize_shard(texts)
+
+    shard_size = -(-len(texts) // (n_jobs * 4))  # a few shards per worker for load balancing
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = executor.map(_tokenize_shard, shards)
+        return [tokens for shard in results for tokens in shard]
+
+
+def binary_term_matrices(tokens_a: List[List[str]], tokens_b: List[List[str]]) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """Binary document-term matrices over a vocabulary shared by both document sets"""
+    vocabulary: Dict[str, int] = {}
+
+    def build(token_lists: List[List[str]]) -> List[np.ndarray]:
+        indptr, indices = [0], []
+        for tokens in token_lists:
+            indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            indptr.append(len(indices))
+        return [np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)]
+
+    parts_a, parts_b = build(tokens_a), build(tokens_b)
+    shape_a, shape_b = (len(tokens_a), len(vocabulary)), (len(tokens_b), len(vocabulary))
+
+    matrix_a = sparse.csr_matrix((np.ones(len(parts_a[0]), dtype=np.float32), *parts_a), shape=shape_a)
+    matrix_b = sparse.csr_matrix((np.ones(len(parts_b[0]), dtype=np.float32), *parts_b), shape=shape_b)
+    return matrix_a, matrix_b
+
+
+def score_matrix(profiles: List[Any],
+                 jobs: List[Any],
+                 metrics: Iterable[str] = TEXT_METRICS,
+                 n_jobs: int = 1,
+                 scorer: Optional[TfidfScorer] = None) -> Dict[str, np.ndarray]:
+    """
+    Score N resumes/profiles against M job descriptions.
+
+    Word-set metrics come from sparse binary matrices: the intersection sizes of all
+    pairs are a single product A @ B.T, and set sizes are row sums. Cosine similarity
+    is a product of L2-normalized TF-IDF matrices.
+
+    Args:
+        profiles (List[Any]): N resumes or profiles (text or JSON-serializable).
+        jobs (List[Any]): M job descriptions (text or JSON-serializable).
+        metrics (Iterable[str], optional): Any of jaccard_similarity, overlap_coefficient, cosine_similarity.
+        n_jobs (int, optional): Worker processes for tokenization. Defaults to 1.
+        scorer (TfidfScorer, optional): Fitted TF-IDF model. Defaults to the reference corpus model,
+            or a vectorizer fitted on profiles and jobs when no corpus is available.
+
+    Returns:
+        Dict[str, np.ndarray]: N×M float matrix per metric.
+    """
+    metrics = list(metrics)
+    unknown = set(metrics) - set(TEXT_METRICS)
+    if unknown:
+        raise ValueError(f"Unsupported batch metrics: {', '.join(sorted(unknown))}")
+
+    profile_texts = [_to_text(document) for document in profiles]
+    job_texts = [_to_text(document) for document in jobs]
+    results: Dict[str, np.ndarray] = {}
+
+    if {"jaccard_similarity", "overlap_coefficient"} & set(metrics):
+        matrix_a, matrix_b = binary_term_matrices(
+            tokenize_documents(profile_texts, n_jobs=n_jobs),
+            tokenize_documents(job_texts, n_jobs=n_jobs),
+        )
+        intersection = (matrix_a @ matrix_b.T).toarray()
+        sizes_a = np.asarray(matrix_a.sum(axis=1), dtype=np.float64)  # N x 1
+        sizes_b = np.asarray(matrix_b.sum(axis=1), dtype=np.float64).T  # 1 x M
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if "jaccard_similarity" in metrics:
+                union = sizes_a + sizes_b - intersection
+                results["jaccard_similarity"] = np.where(union > 0, intersection / union, 0.0)
+            if "overlap_coefficient" in metrics:
+                min_size = np.minimum(sizes_a, sizes_b)
+                results["overlap_coefficient"] = np.where(min_size > 0, intersection / min_size, 0.0)
+
+    if "cosine_similarity" in metrics:
+        if scorer is None:
+            scorer = get_default_scorer()
+        if scorer is not None:
+            vectors_a, vectors_b = scorer.transform(profile_texts), scorer.transform(job_texts)
+        else:
+            vectorizer = TfidfVectorizer().fit(profile_texts + job_texts)
+            vectors_a, vectors_b = vectorizer.transform(profile_texts), vectorizer.transform(job_texts)
+        results["cosine_similarity"] = (vectors_a @ vectors_b.T).toarray()
+
+    logger.info(f"Scored {len(profile_texts)}x{len(job_texts)} pairs for {', '.join(metrics)}")
+    return {metric: results[metric] for metric in metrics}
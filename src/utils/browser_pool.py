@@ -0,0 +1,211 @@
+'''
+---------------------------------
+File: browser_pool.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import atexit
+import asyncio
+import logging
+import threading
+import functools
+import concurrent.futures
+
+from typing import List, Optional, Sequence
+
+from src.envs import BROWSER_POOL_SIZE, BROWSER_PAGE_TIMEOUT, BROWSER_CONTEXT_MAX_PAGES
+
+
+logger = logging.getLogger(__name__)
+
+# Resource types the text extractor never needs
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest", "other"})
+
+# Analytics and ad hosts, matched as substrings of the request URL
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook", "hotjar.com", "segment.io", "segment.com", "mixpanel.com",
+    "newrelic.com", "nr-data.net", "optimizely.com", "scorecardresearch.com", "linkedin.com/li/track",
+)
+
+REMOVE_SELECTORS_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        document.querySelectorAll(selector).forEach((element) => element.remove());
+    }
+}
+"""
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared across requests.
+
+    The browser runs on a private asyncio loop in a daemon thread, so any thread can call
+    `fetch_text`. A fixed set of browser contexts is reused between requests (bounding the
+    number of pages loading at once), non-document resources and trackers are blocked at
+    the network layer, and each page load is limited by a timeout.
+
+    Args:
+        size (int, optional): Number of browser contexts. Defaults to BROWSER_POOL_SIZE.
+        page_timeout (float, optional): Page load timeout in seconds. Defaults to BROWSER_PAGE_TIMEOUT.
+        blocked_resource_types (Sequence[str], optional): Playwright resource types to abort.
+        blocked_url_patterns (Sequence[str], optional): URL substrings to abort.
+    """
+
+    def __init__(self,
+                 size: int = BROWSER_POOL_SIZE,
+                 page_timeout: float = BROWSER_PAGE_TIMEOUT,
+                 blocked_resource_types: Sequence[str] = BLOCKED_RESOURCE_TYPES,
+                 blocked_url_patterns: Sequence[str] = BLOCKED_URL_PATTERNS):
+        self.size = max(1, size)
+        self.page_timeout = page_timeout
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.blocked_url_patterns = tuple(blocked_url_patterns)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: Optional[asyncio.Queue] = None
+        self._context_pages = {}
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+    def fetch_text(self, url: str, remove_selectors: Optional[List[str]] = None, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Load a page and return its rendered body text.
+
+        Args:
+            url (str): Page URL.
+            remove_selectors (List[str], optional): CSS selectors removed before reading the text.
+            timeout (float, optional): Page load timeout in seconds. Defaults to page_timeout.
+
+        Returns:
+            Optional[str]: The page's visible text, or None if the fetch timed out.
+        """
+        timeout = timeout or self.page_timeout
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url, remove_selectors or [], timeout), loop)
+        try:
+            # Allow for waiting on a free context on top of the page load itself
+            return future.result(timeout=timeout * 4)
+        except concurrent.futures.TimeoutError:
+            # Cancel the coroutine so it closes its page and returns the context to the pool
+            future.cancel()
+            logger.warning(f"Browser fetch of {url} timed out after {timeout * 4:g}s")
+            return None
+
+    def close(self) -> None:
+        """Close the browser and stop the loop thread"""
+        with self._start_lock:
+            if self._loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=30)
+            except Exception as e:
+                logger.debug(f"Error closing browser pool: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop, self._thread = None, None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+                thread.start()
+                try:
+                    asyncio.run_coroutine_threadsafe(self._launch(), loop).result()
+                except Exception:
+                    loop.call_soon_threadsafe(loop.stop)
+                    thread.join(timeout=5)
+                    raise
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _launch(self) -> None:
+        """Start Playwright, the browser and the context pool"""
+        from playwright.async_api import async_playwright
+
+        self._launch_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        try:
+            await self._launch_browser()
+        except Exception:
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+
+    async def _launch_browser(self) -> None:
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts = asyncio.Queue()
+        self._context_pages = {}
+        for _ in range(self.size):
+            self._contexts.put_nowait(await self._new_context())
+        logger.info(f"Browser pool started with {self.size} contexts")
+
+    async def _new_context(self):
+        context = await self._browser.new_context(java_script_enabled=True)
+        await context.route("**/*", self._route)
+        self._context_pages[context] = 0
+        return context
+
+    async def _route(self, route) -> None:
+        """Abort resource types and hosts the text extractor discards"""
+        request = route.request
+        if request.resource_type in self.blocked_resource_types or any(pattern in request.url for pattern in self.blocked_url_patterns):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _fetch(self, url: str, remove_selectors: List[str], timeout: float) -> Optional[str]:
+        async with self._launch_lock:
+            if not self._browser.is_connected():
+                logger.warning("Browser disconnected, relaunching")
+                await self._launch_browser()
+
+        contexts = self._contexts
+        context = await contexts.get()
+        try:
+            page = await context.new_page()
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+                try:
+                    # Give client-side rendering a short chance to settle
+                    await page.wait_for_load_state("networkidle", timeout=min(timeout, 5) * 1000)
+                except Exception:
+                    pass
+                if remove_selectors:
+                    await page.evaluate(REMOVE_SELECTORS_JS, remove_selectors)
+                return await page.evaluate("() => document.body ? document.body.innerText : ''")
+            finally:
+                await page.close()
+        finally:
+            self._context_pages[context] = self._context_pages.get(context, 0) + 1
+            if self._context_pages[context] >= BROWSER_CONTEXT_MAX_PAGES and self._browser.is_connected():
+                # Recycle long-used contexts to keep memory bounded
+                self._context_pages.pop(context, None)
+                await context.close()
+                context = await self._new_context()
+            contexts.put_nowait(context)
+
+    async def _shutdown(self) -> None:
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+        finally:
+            if self._playwright is not None:
+                await self._playwright.stop()
+            self._browser, self._playwright = None, None
+
+
+@functools.lru_cache(maxsize=None)
+def get_browser_pool() -> BrowserPool:
+    """Process-wide browser pool, closed at interpreter exit"""
+    pool = BrowserPool()
+    atexit.register(pool.close)
+    return pool
@@ -0,0 +1,310 @@
+'''
+---------------------------------
+File: cache.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+import functools
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from pathlib import Path
+
+from src.envs import (
+    CACHE_DIR,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_TTL,
+    PROFILE_CACHE_MAX_BYTES,
+    PROFILE_CACHE_TTL,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_MAX_BYTES,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a content-addressed key (SHA-256) from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_sha256(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key-value cache stored in a single SQLite file.
+
+    Values are stored as JSON. Entries older than `ttl` seconds are treated as misses,
+    and the least recently used entries are evicted once the total payload size
+    exceeds `max_bytes`. Safe to share between threads.
+
+    Args:
+        path (Union[str, Path]): SQLite database file.
+        max_bytes (int, optional): Maximum total size of stored values. Defaults to LLM_CACHE_MAX_BYTES.
+        ttl (float, optional): Entry lifetime in seconds, None disables expiry. Defaults to LLM_CACHE_TTL.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = LLM_CACHE_MAX_BYTES, ttl: Optional[float] = LLM_CACHE_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value and evict old entries if needed"""
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and storage usage"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones above max_bytes (lock must be held)"""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        stale_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+        logger.debug(f"Evicted {len(stale_keys)} entries from {self.path.name}")
+
+
+class RenderCache:
+    """
+    Content-addressed store of compiled resumes.
+
+    Each entry is a directory holding the .pdf and .tex produced for one cache key.
+    A hit copies both files to the requested destination, so nothing is recompiled and
+    later writes to the output never touch the cache. Both copies are staged first and
+    only renamed into place once both exist. An entry's directory mtime records its last
+    use, and the least recently used entries are evicted once the total size exceeds
+    `max_bytes`. Entries are published with an atomic rename, so concurrent processes
+    can share the directory.
+
+    Args:
+        directory (Union[str, Path], optional): Cache directory. Defaults to RENDER_CACHE_DIR.
+        max_bytes (int, optional): Maximum total size of stored files. Defaults to RENDER_CACHE_MAX_BYTES.
+    """
+
+    ARTIFACTS = [".pdf", ".tex"]
+
+    def __init__(self, directory: Union[str, Path] = RENDER_CACHE_DIR, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+
+    def fetch(self, key: str, dst_path: Union[str, Path]) -> Optional[str]:
+        """Copy the cached PDF and .tex for `key` to dst_path; None on a miss"""
+        entry = self.directory / key
+        dst_path = Path(dst_path)
+        staged = []
+        try:
+            os.makedirs(dst_path.parent, exist_ok=True)
+            for suffix in self.ARTIFACTS:
+                target = dst_path.with_suffix(suffix)
+                staging = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                staged.append((staging, target))
+                shutil.copyfile(entry / f"resume{suffix}", staging)
+        except OSError as e:
+            # Missing or concurrently evicted entry: leave dst_path untouched
+            for staging, _ in staged:
+                staging.unlink(missing_ok=True)
+            if not isinstance(e, FileNotFoundError):
+                logger.debug(f"Render cache entry {key[:12]} not served: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # The PDF goes last, so an existing output PDF always has its .tex beside it
+        for staging, target in reversed(staged):
+            os.replace(staging, target)
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return str(dst_path)
+
+    def store(self, key: str, pdf_path: Union[str, Path]) -> None:
+        """Copy a compiled PDF and the .tex beside it into the cache"""
+        pdf_path = Path(pdf_path)
+        entry = self.directory / key
+        if entry.exists():
+            return
+
+        staging = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            staging.mkdir(parents=True)
+            for suffix in self.ARTIFACTS:
+                shutil.copyfile(pdf_path.with_suffix(suffix), staging / f"resume{suffix}")
+            os.rename(staging, entry)
+        except OSError as e:
+            # Another process published the same entry first, or the artifacts are gone
+            logger.debug(f"Render cache entry {key[:12]} not stored: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        with self._lock:
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and storage usage"""
+        entries = self._entries()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, _, size in entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _entries(self) -> List[Tuple[Path, float, int]]:
+        """(entry, last used, size) for every published entry"""
+        entries = []
+        for entry in self.directory.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(file.stat().st_size for file in entry.iterdir())
+                entries.append((entry, entry.stat().st_mtime, size))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _evict(self) -> None:
+        """Drop least recently used entries above max_bytes (lock must be held)"""
+        entries = self._entries()
+        excess = sum(size for _, _, size in entries) - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = 0
+        for entry, _, size in sorted(entries, key=lambda item: item[1]):
+            if excess <= 0:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            excess -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} entries from {self.directory.name}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm_cache() -> DiskCache:
+    """Process-wide LLM response cache"""
+    return DiskCache(CACHE_DIR / "llm_responses.sqlite3")
+
+
+@functools.lru_cache(maxsize=None)
+def get_profile_cache() -> DiskCache:
+    """Process-wide cache of parsed resume PDFs"""
+    return DiskCache(CACHE_DIR / "profiles.sqlite3", max_bytes=PROFILE_CACHE_MAX_BYTES, ttl=PROFILE_CACHE_TTL)
+
+
+@functools.lru_cache(maxsize=None)
+def get_render_cache() -> RenderCache:
+    """Process-wide cache of compiled resume PDFs"""
+    return RenderCache()
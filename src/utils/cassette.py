@@ -0,0 +1,161 @@
+'''
+---------------------------------
+File: cassette.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import copy
+import gzip
+import json
+import base64
+import logging
+import threading
+
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import numpy as np
+
+from src.utils.cache import make_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+def encode_matrix(matrix: np.ndarray) -> Dict[str, Any]:
+    """Compact JSON form of a float32 embedding matrix"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    return {"shape": list(matrix.shape), "data": base64.b64encode(matrix.tobytes()).decode("ascii")}
+
+
+def decode_matrix(value: Dict[str, Any]) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(value["data"]), dtype=np.float32).reshape(value["shape"]).copy()
+
+
+class Cassette:
+    """
+    Record/replay store for LLM (and other external) calls, keyed by request fingerprint.
+
+    In "record" mode every successful live call is appended to a JSON-lines fixture
+    (gzip-compressed when the path ends in .gz). In "replay" mode responses are served
+    from the fixture and a request without a recording raises CassetteMissError, so
+    offline runs never silently fall back to the network.
+
+    Args:
+        path (Union[str, Path]): Fixture file.
+        mode (str): "record" or "replay".
+    """
+
+    MODES = ["record", "replay"]
+
+    def __init__(self, path: Union[str, Path], mode: str = "replay"):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid cassette mode: {mode}. Choose from {', '.join(self.MODES)}")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = self._load()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+        if mode == "replay" and not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        logger.info(f"Cassette {self.path} opened in {mode} mode with {len(self._entries)} recordings")
+
+    @staticmethod
+    def fingerprint(kind: str, payload: Any) -> str:
+        return make_cache_key("cassette", kind, payload)
+
+    def play(self,
+             kind: str,
+             payload: Any,
+             live: Callable[[], Any],
+             encode: Optional[Callable[[Any], Any]] = None,
+             decode: Optional[Callable[[Any], Any]] = None,
+             record_if: Callable[[Any], bool] = bool) -> Any:
+        """
+        Serve a recorded response for (kind, payload), or call `live` and record its result.
+
+        Args:
+            kind (str): Request type, part of the fingerprint (e.g. "chat", "embedding").
+            payload (Any): JSON-serializable request description.
+            live (Callable[[], Any]): Performs the real call (record mode only).
+            encode / decode (Callable, optional): Convert results to and from JSON values.
+            record_if (Callable[[Any], bool]): Only results passing this are recorded.
+
+        Raises:
+            CassetteMissError: In replay mode when nothing was recorded for the request.
+        """
+        key = self.fingerprint(kind, payload)
+        if self.mode == "replay":
+            return self._replay(key, kind, decode)
+
+        result = live()
+        self._record(key, kind, result, encode, record_if)
+        return result
+
+    async def aplay(self,
+                    kind: str,
+                    payload: Any,
+                    live: Callable[[], Awaitable[Any]],
+                    encode: Optional[Callable[[Any], Any]] = None,
+                    decode: Optional[Callable[[Any], Any]] = None,
+                    record_if: Callable[[Any], bool] = bool) -> Any:
+        """Async version of play; `live` returns an awaitable"""
+        key = self.fingerprint(kind, payload)
+        if self.mode == "replay":
+            return self._replay(key, kind, decode)
+
+        result = await live()
+        self._record(key, kind, result, encode, record_if)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _replay(self, key: str, kind: str, decode: Optional[Callable[[Any], Any]]) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                raise CassetteMissError(f"No recorded {kind} response for fingerprint {key[:12]} in {self.path}")
+            self.stats["hits"] += 1
+            value = self._entries[key]
+
+        # Callers may mutate what they get back (e.g. job_details.pop), so hand out copies
+        return decode(value) if decode else copy.deepcopy(value)
+
+    def _record(self, key: str, kind: str, result: Any, encode: Optional[Callable[[Any], Any]], record_if: Callable[[Any], bool]) -> None:
+        if not record_if(result):
+            return
+        value = encode(result) if encode else copy.deepcopy(result)
+        line = json.dumps({"key": key, "kind": kind, "value": value}, ensure_ascii=False, separators=(",", ":"))
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._open("at") as file:
+                file.write(line + "\n")
+            self.stats["recorded"] += 1
+
+    def _open(self, mode: str):
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> Dict[str, Any]:
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with self._open("rt") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    entries[record["key"]] = record["value"]
+        return entries
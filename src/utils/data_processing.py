@@ -6,19 +6,28 @@ Email: u.shernaz4rov@gmail.com
 Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
 ---------------------------------
 '''
+import os
 import re
-import requests
+import json
 import logging
 import time
+import threading
 import functools
+import contextlib
+import multiprocessing
 
-from typing import List, Dict, Optional, Union
-from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 import PyPDF2
+try:
+    import fitz  # PyMuPDF: C-backed, much faster than PyPDF2
+except ImportError:
+    fitz = None
 from bs4 import BeautifulSoup
 from langchain_community.document_loaders import (
-    PlaywrightURLLoader, 
     UnstructuredURLLoader, 
     WebBaseLoader
 )
@@ -27,6 +36,14 @@ from src.utils.utils import (
     timer_decoder, error_handler,
     TextCleaner
 )
+from src.utils.browser_pool import get_browser_pool
+from src.utils.http_cache import get_http_fetcher, normalize_url
+from src.utils.rate_limit import HostLimiter
+from src.envs import (
+    WEB_CONTENT_SCORE_THRESHOLD, WEB_CONTENT_MIN_SCORE, WEB_STRATEGY_MEMORY_PATH,
+    FETCH_MAX_WORKERS, FETCH_PER_HOST_CONCURRENCY, FETCH_PER_HOST_RPS,
+    PDF_PROCESS_MIN_PAGES, PDF_SHARD_PAGES, PDF_MAX_WORKERS
+)
 
 
 # # Configuring logging
@@ -53,6 +70,73 @@ SELECTORS = {
     ]
 }
 
+# Words whose presence suggests the page text contains an actual job posting
+JOB_SECTION_KEYWORDS = [
+    "responsibilit", "requirement", "qualification", "experience", "skills",
+    "about the role", "about us", "what you", "benefits", "apply", "job description", "salary",
+]
+JOB_CONTENT_MIN_LENGTH = 1500
+
+
+def score_job_content(text: Optional[str]) -> float:
+    """
+    Score extracted page text for completeness as a job posting.
+
+    Half of the score comes from length (saturating at JOB_CONTENT_MIN_LENGTH characters),
+    half from how many job-section keywords appear (saturating at four).
+
+    Returns:
+        float: Score between 0 and 1.
+    """
+    if not text:
+        return 0.0
+    lowered = text.lower()
+    keyword_hits = sum(1 for keyword in JOB_SECTION_KEYWORDS if keyword in lowered)
+    return 0.5 * min(len(text) / JOB_CONTENT_MIN_LENGTH, 1.0) + 0.5 * min(keyword_hits / 4, 1.0)
+
+
+class DomainStrategyMemory:
+    """Remembers which extraction strategy worked for each domain, persisted as JSON"""
+
+    def __init__(self, path: Union[str, os.PathLike] = WEB_STRATEGY_MEMORY_PATH):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._strategies: Dict[str, Dict] = {}
+        try:
+            with open(self.path, "r") as file:
+                self._strategies = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, domain: str) -> Optional[str]:
+        """Strategy name that last succeeded for the domain"""
+        with self._lock:
+            entry = self._strategies.get(domain)
+        return entry["strategy"] if entry else None
+
+    def remember(self, domain: str, strategy: str, latency: float, score: float) -> None:
+        """Record the winning strategy for a domain"""
+        with self._lock:
+            self._strategies[domain] = {"strategy": strategy, "latency": round(latency, 3), "score": round(score, 3)}
+            self._persist()
+
+    def forget(self, domain: str) -> None:
+        """Drop a domain's remembered strategy"""
+        with self._lock:
+            if self._strategies.pop(domain, None) is not None:
+                self._persist()
+
+    def _persist(self) -> None:
+        """Atomically write the strategies to disk (lock must be held)"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(self._strategies, file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f"Could not persist web strategy memory: {e}")
+
 
 class WebContentExtractor:
     """Class for extracting content from web pages"""
@@ -70,50 +154,122 @@ class WebContentExtractor:
             
         return selectors
     
+    # Extraction strategies from cheapest to heaviest
+    STRATEGIES = ["http", "web_base", "unstructured", "playwright"]
+    domain_memory: Optional[DomainStrategyMemory] = None
+
+    @staticmethod
+    def _get_domain_memory() -> DomainStrategyMemory:
+        """Shared per-domain strategy memory, created on first use"""
+        if WebContentExtractor.domain_memory is None:
+            WebContentExtractor.domain_memory = DomainStrategyMemory()
+        return WebContentExtractor.domain_memory
+
+    @staticmethod
+    def _load_with(loader) -> Optional[str]:
+        """Run a LangChain loader and clean the page text"""
+        pages = loader.load()
+        content = ""
+        for page in pages or []:
+            if page.page_content.strip():
+                text_list = page.page_content.split('\n')
+                cleaned_texts = TextCleaner.clean_text_list(text_list)
+                content += TextCleaner.join_text_list(cleaned_texts)
+        return content or None
+
+    @staticmethod
+    def _run_strategy(strategy: str, url: str, selectors: List[str], limiter: Optional[HostLimiter] = None) -> Optional[str]:
+        """
+        Extract page text with a single strategy.
+
+        With a limiter, each strategy's page request takes its own per-host slot, so every
+        request of the cascade counts against the host's rate limit.
+        """
+        if strategy == "http":
+            # The HTTP fetcher takes the slot around the network request only
+            return WebContentExtractor.extract_with_bs4(url, limiter=limiter)
+
+        slot = limiter.limit(urlparse(url).netloc) if limiter is not None else contextlib.nullcontext()
+        with slot:
+            if strategy == "web_base":
+                return WebContentExtractor._load_with(WebBaseLoader(url))
+            if strategy == "unstructured":
+                return WebContentExtractor._load_with(UnstructuredURLLoader(urls=[url], ssl_verify=False, remove_selectors=selectors))
+            if strategy == "playwright":
+                return WebContentExtractor.extract_with_browser(url, selectors)
+        raise ValueError(f"Unknown extraction strategy: {strategy}")
+
     @staticmethod
     @error_handler
     @timer_decoder
-    def extract_from_url(url: str) -> Optional[str]:
-        """Extract content from url"""
+    def extract_from_url(url: str, limiter: Optional[HostLimiter] = None) -> Optional[str]:
+        """
+        Extract content from url with a cheap-first adaptive cascade.
+
+        Strategies run from a plain HTTP fetch up to a headless browser, stopping at the first
+        one whose text scores at least WEB_CONTENT_SCORE_THRESHOLD. The winner is remembered
+        per domain and tried first next time. If nothing passes, the best-scoring text is returned,
+        unless it scores below WEB_CONTENT_MIN_SCORE.
+        A `limiter` applies per-host limits to each outbound request of the cascade.
+        """
         if not url:
             logger.warning("No URL provided")
             return None
         
         selectors = WebContentExtractor._get_selectors_for_url(url)
+        domain = urlparse(url).netloc.lower()
+        memory = WebContentExtractor._get_domain_memory()
 
-        # Try different loaders with error handling
-        loaders = [
-            PlaywrightURLLoader(urls=[url], remove_selectors=selectors),
-            UnstructuredURLLoader(urls=[url], ssl_verify=False, remove_selectors=selectors),
-            WebBaseLoader(url)
-        ]
+        remembered = memory.get(domain)
+        strategies = WebContentExtractor.STRATEGIES.copy()
+        if remembered in strategies:
+            strategies.remove(remembered)
+            strategies.insert(0, remembered)
 
-        for loader in loaders:
+        best_content, best_score = None, 0.0
+        for strategy in strategies:
+            start_time = time.perf_counter()
             try:
-                pages = loader.load()
-                if pages:
-                    content = ""
-                    for page in pages:
-                        if page.page_content.strip():
-                            text_list = page.page_content.split('\n')
-                            cleaned_texts = TextCleaner.clean_text_list(text_list)
-                            content += TextCleaner.join_text_list(cleaned_texts)
-                    if content:
-                        return content
+                content = WebContentExtractor._run_strategy(strategy, url, selectors, limiter)
             except Exception as e:
-                logger.debug(f"Loader {loader.__class__.__name__} failed: {str(e)}")
-                continue
+                logger.debug(f"Strategy {strategy} failed for {url}: {str(e)}")
+                content = None
+            latency = time.perf_counter() - start_time
+
+            score = score_job_content(content)
+            logger.info(f"Strategy {strategy} scored {score:.2f} in {latency:.2f}s for {domain}")
+
+            if score >= WEB_CONTENT_SCORE_THRESHOLD:
+                memory.remember(domain, strategy, latency, score)
+                return content
 
-        # Fallback to simple BS4
-        return WebContentExtractor.extract_with_bs4(url)
+            if content and score > best_score:
+                best_content, best_score = content, score
+
+            if strategy == remembered:
+                # The remembered strategy no longer works for this domain
+                memory.forget(domain)
+
+        if best_score < WEB_CONTENT_MIN_SCORE:
+            logger.warning(f"No extraction strategy produced usable content for {url} (best score {best_score:.2f})")
+            return None
+        return best_content
     
+    @staticmethod
+    def extract_with_browser(url: str, selectors: Optional[List[str]] = None) -> Optional[str]:
+        """Extract rendered page text with the shared headless browser pool"""
+        text = get_browser_pool().fetch_text(url, remove_selectors=selectors)
+        if not text or not text.strip():
+            return None
+        return TextCleaner.join_text_list(TextCleaner.clean_text_list(text.split('\n')))
+
     @staticmethod
     @error_handler
-    def extract_with_bs4(url: str) -> Optional[str]:
+    def extract_with_bs4(url: str, limiter: Optional[HostLimiter] = None) -> Optional[str]:
         """Extract content using BeautifulSoup as a fallback method"""
         try:
-            res = requests.get(url, timeout=10)
-            res.raise_for_status() # Raise exception for bad responses
+            # Cached, revalidating fetch; raises for bad responses
+            res = get_http_fetcher().fetch(url, timeout=10, limiter=limiter)
 
             soup = BeautifulSoup(res.content, "html.parser")
 
@@ -137,73 +293,203 @@ class WebContentExtractor:
             return None
         
 
+def fetch_job_pages(urls: Iterable[str],
+                    max_workers: int = FETCH_MAX_WORKERS,
+                    per_host_concurrency: int = FETCH_PER_HOST_CONCURRENCY,
+                    per_host_rps: float = FETCH_PER_HOST_RPS) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Fetch many job pages concurrently, yielding results as they complete.
+
+    URLs that normalize to the same address are fetched once, using the first of them
+    as given (normalization only keys the deduplication). Each host gets at most
+    `per_host_concurrency` requests in flight, started at most `per_host_rps` per second;
+    the limits apply to every request the extraction cascade sends, not once per URL.
+
+    Args:
+        urls (Iterable[str]): Job posting URLs.
+        max_workers (int, optional): Total worker threads. Defaults to FETCH_MAX_WORKERS.
+        per_host_concurrency (int, optional): In-flight requests per host. Defaults to FETCH_PER_HOST_CONCURRENCY.
+        per_host_rps (float, optional): Request starts per second per host. Defaults to FETCH_PER_HOST_RPS.
+
+    Yields:
+        Tuple[str, Optional[str]]: (input URL, extracted text or None) for every input URL,
+        in completion order.
+    """
+    groups: Dict[str, List[str]] = {}
+    for url in urls:
+        if url and url.strip():
+            groups.setdefault(normalize_url(url), []).append(url)
+    if not groups:
+        return
+
+    limiter = HostLimiter(per_host_concurrency, per_host_rps)
+
+    def fetch(normalized: str) -> Optional[str]:
+        # Normalization drops fragments and reorders queries, which client-side routed
+        # job boards rely on, so the page is fetched at an address the caller supplied
+        return WebContentExtractor.extract_from_url(groups[normalized][0], limiter=limiter)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(groups)))
+    try:
+        futures = {executor.submit(fetch, normalized): normalized for normalized in groups}
+        for future in as_completed(futures):
+            try:
+                content = future.result()
+            except Exception as e:
+                logger.error(f"Failed to fetch {futures[future]}: {e}")
+                content = None
+            for url in groups[futures[future]]:
+                yield url, content
+    finally:
+        # Stop queued fetches if the caller abandons the generator
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+PDF_BACKENDS = ["pymupdf", "pypdf2"] if fitz is not None else ["pypdf2"]
+
+# Page workers start from a clean interpreter: forking would copy the parent's threads'
+# held locks (HTTP pools, browser loop, rate limiters) into the children
+PDF_PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_process_context() -> multiprocessing.context.BaseContext:
+    """Start-method context for PDF page workers"""
+    context = multiprocessing.get_context(PDF_PROCESS_START_METHOD)
+    if PDF_PROCESS_START_METHOD == "forkserver":
+        # Import this module once in the (single-threaded) fork server, so workers
+        # fork with it loaded instead of re-importing the package each
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def _clean_page_text(text: str) -> str:
+    """Clean raw page text the same way for every backend"""
+    cleaned_text = TextCleaner.clean_text_list((text or "").split("\n"))
+    return TextCleaner.join_text_list(cleaned_text)
+
+
+def _iter_page_range(pdf_path: str, start: int, end: int, backend: str) -> Iterator[str]:
+    """Yield cleaned text for pages [start, end), opening the file once"""
+    if backend == "pymupdf":
+        with fitz.open(pdf_path) as document:
+            for page_num in range(start, end):
+                yield _clean_page_text(document[page_num].get_text())
+    else:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page_num in range(start, end):
+                yield _clean_page_text(pdf_reader.pages[page_num].extract_text())
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int, backend: str) -> List[str]:
+    """Process pool worker: the reader is not picklable, so each shard reopens the file"""
+    return list(_iter_page_range(pdf_path, start, end, backend))
+
+
 class PDFExtractor:
     """Class for extracting content from PDF files"""
 
     @staticmethod
     @error_handler
     @timer_decoder
-    def extract_text(pdf_path: str) -> Optional[str]:
+    def extract_text(pdf_path: str, backend: Optional[str] = None) -> Optional[str]:
         """Extract text from a PDF file"""
         if not pdf_path:
             logger.warning("No PDF Path provided")
             return None
     
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-
-                # For large pdfs, using parallel processing
-                if num_pages > 10:
-                    return PDFExtractor._extract_parallel(pdf_reader, num_pages)
-                else:
-                    return PDFExtractor._extract_sequential(pdf_reader, num_pages)
+            return "\n".join(PDFExtractor.iter_pages(pdf_path, backend=backend))
         except Exception as e:
             logger.error(f"PDF extraction error: {str(e)}")
             return None
-        
+
     @staticmethod
-    def _extract_page(pdf_reader, page_num: int) -> str:
-        """Extract text form a single page"""
-        page = pdf_reader.pages[page_num]
-       
-        text = page.extract_text().split("\n")
-       
-        cleaned_text = TextCleaner.clean_text_list(text)
-       
-        return TextCleaner.join_text_list(cleaned_text)
-    
+    def page_count(pdf_path: str, backend: Optional[str] = None) -> int:
+        """Number of pages in a PDF"""
+        backend = PDFExtractor._resolve_backend(backend)
+        if backend == "pymupdf":
+            with fitz.open(pdf_path) as document:
+                return document.page_count
+        with open(pdf_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
     @staticmethod
-    def _extract_sequential(pdf_reader, num_pages: int) -> str:
-        """Extract text from PDF page sequentially"""
-        all_text = []
-    
-        for page_num in range(num_pages):
-            all_text.append(PDFExtractor._extract_page(pdf_reader, page_num))
-    
-        return "\n".join(all_text)
-    
+    def iter_pages(pdf_path: str,
+                   backend: Optional[str] = None,
+                   max_workers: int = PDF_MAX_WORKERS,
+                   shard_size: int = PDF_SHARD_PAGES,
+                   min_parallel_pages: int = PDF_PROCESS_MIN_PAGES) -> Iterator[str]:
+        """
+        Stream cleaned page text in page order.
+
+        Small documents are read page by page in-process. Documents with at least
+        `min_parallel_pages` pages are split into `shard_size`-page ranges extracted on a
+        process pool; at most 2 * max_workers shards are in flight, so memory stays bounded
+        by the window rather than the document.
+
+        Args:
+            pdf_path (str): Path to the PDF.
+            backend (str, optional): "pymupdf" or "pypdf2". Defaults to the fastest installed.
+            max_workers (int, optional): Process pool size. Defaults to PDF_MAX_WORKERS.
+            shard_size (int, optional): Pages per worker task. Defaults to PDF_SHARD_PAGES.
+            min_parallel_pages (int, optional): Page count at which the process pool is used.
+
+        Yields:
+            str: Cleaned text of each page.
+        """
+        backend = PDFExtractor._resolve_backend(backend)
+        num_pages = PDFExtractor.page_count(pdf_path, backend)
+
+        if num_pages < min_parallel_pages or max_workers <= 1:
+            yield from _iter_page_range(pdf_path, 0, num_pages, backend)
+            return
+
+        shards = deque((start, min(start + shard_size, num_pages)) for start in range(0, num_pages, shard_size))
+        executor = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(shards)),
+            mp_context=_pdf_process_context(),
+        )
+        try:
+            in_flight = deque()
+            while shards or in_flight:
+                while shards and len(in_flight) < 2 * max_workers:
+                    start, end = shards.popleft()
+                    in_flight.append(executor.submit(_extract_page_range, pdf_path, start, end, backend))
+                yield from in_flight.popleft().result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     @staticmethod
-    def _extract_parallel(pdf_reader, num_pages: int) -> str:
-        """Extract text from PDF page in parallel"""
-        with ThreadPoolExecutor(max_workers=min(num_pages, 8)) as executor:
-            extract_fn = functools.partial(PDFExtractor._extract_page, pdf_reader)
-            results = list(executor.map(extract_fn, range(num_pages)))
-        return "\n".join(results)
+    def _resolve_backend(backend: Optional[str]) -> str:
+        if backend is None:
+            return PDF_BACKENDS[0]
+        if backend not in PDF_BACKENDS:
+            raise ValueError(f"PDF backend '{backend}' is not available, choose from {PDF_BACKENDS}")
+        return backend
     
 
 # Public API functions for backward compatibility
 @error_handler
-def read_data_from_url(url: str) -> Optional[str]:
-    """Extract text content from url"""
-    return WebContentExtractor.extract_from_url(url)
+def read_data_from_url(url: Union[str, List[str]]) -> Optional[str]:
+    """Extract text content from a url, or from several urls joined in input order"""
+    if isinstance(url, str):
+        return WebContentExtractor.extract_from_url(url)
+
+    contents = dict(fetch_job_pages(url))
+    texts = [contents[item] for item in url if contents.get(item)]
+    return "\n".join(texts) if texts else None
 
 @error_handler
 def extract_text(pdf_path: str) -> Optional[str]:
     """Extract text from a PDF"""
     return PDFExtractor.extract_text(pdf_path)
 
+def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
+    """Stream cleaned page text from a PDF"""
+    return PDFExtractor.iter_pages(pdf_path)
+
 @error_handler
 def get_url_content(url: str) -> Optional[str]:
     """Legacy function for extracting URL with BS4"""
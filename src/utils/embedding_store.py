@@ -0,0 +1,205 @@
+'''
+---------------------------------
+File: embedding_store.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import functools
+import contextlib
+
+from typing import Callable, Dict, Iterator, List, Optional, Union
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads within one process are serialized
+    fcntl = None
+
+from src.envs import CACHE_DIR, GPT_EMBEDDING_MODEL
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """
+    Persistent store of chunk embeddings for a single embedding model.
+
+    Vectors are appended to a raw float32 file that is read back through a memory map,
+    and a JSON index maps the SHA-256 of each chunk text to its row. Every unique chunk
+    is therefore embedded once, across runs. Appends hold an inter-process file lock, so
+    several processes (e.g. the CLI and the Streamlit app) can share one store.
+
+    Args:
+        directory (Union[str, Path]): Root directory of the store.
+        model (str, optional): Embedding model name, each model gets its own subdirectory.
+    """
+
+    def __init__(self, directory: Union[str, Path], model: str = GPT_EMBEDDING_MODEL):
+        self.model = model
+        self.directory = Path(directory) / re.sub(r"[^a-zA-Z0-9_.-]+", "_", model)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._vectors_path = self.directory / "vectors.f32"
+        self._index_path = self.directory / "index.json"
+        self._lock_path = self.directory / "store.lock"
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        with self._lock, self._file_lock():
+            self._load_index()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hash of a chunk as it is sent to the embedding API"""
+        return hashlib.sha256(text.replace("\n", " ").encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, text: str) -> bool:
+        return self.text_hash(text) in self.rows
+
+    def get_or_compute(self, texts: List[str], embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for `texts`, computing only chunks that are not stored yet.
+
+        Args:
+            texts (List[str]): Chunk texts, duplicates are embedded once.
+            embed_fn (Callable): Maps a list of texts to a float32 matrix, one row per text.
+
+        Returns:
+            np.ndarray: float32 matrix with one row per input text, or an empty matrix on failure.
+        """
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+
+        hashes = [self.text_hash(text) for text in texts]
+
+        with self._lock:
+            missing = {}
+            for text, text_hash in zip(texts, hashes):
+                if text_hash not in self.rows and text_hash not in missing:
+                    missing[text_hash] = text
+
+        if missing:
+            logger.info(f"Embedding {len(missing)} new chunks ({len(texts) - len(missing)} reused from store)")
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            if vectors.ndim != 2 or vectors.shape[0] != len(missing):
+                logger.error("Embedding function returned an unexpected shape, skipping store update")
+                return np.empty((0, self.dim or 0), dtype=np.float32)
+            self._append(list(missing.keys()), vectors)
+
+        with self._lock:
+            matrix = self._get_matrix()
+            return np.ascontiguousarray(matrix[[self.rows[text_hash] for text_hash in hashes]])
+
+    def _append(self, hashes: List[str], vectors: np.ndarray) -> None:
+        """Append new vectors to the data file and persist the index"""
+        with self._lock, self._file_lock():
+            # Pick up rows other processes appended and drop bytes no index refers to
+            self._load_index()
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension mismatch: store has {self.dim}, got {vectors.shape[1]}")
+
+            keep = {}
+            for i, text_hash in enumerate(hashes):
+                # Another thread or process may have stored some of these chunks meanwhile
+                if text_hash not in self.rows and text_hash not in keep:
+                    keep[text_hash] = i
+            if not keep:
+                return
+
+            row_bytes = self.dim * np.dtype(np.float32).itemsize
+            with open(self._vectors_path, "ab") as file:
+                next_row = file.tell() // row_bytes
+                vectors[list(keep.values())].astype(np.float32, copy=False).tofile(file)
+
+            for offset, text_hash in enumerate(keep):
+                self.rows[text_hash] = next_row + offset
+
+            self._matrix = None
+            self._save_index()
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock shared by every process using this store"""
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _get_matrix(self) -> np.ndarray:
+        """Memory map of all stored vectors (lock must be held)"""
+        if not self.rows:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != len(self.rows):
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(len(self.rows), self.dim))
+        return self._matrix
+
+    def _load_index(self) -> None:
+        """
+        Load the hash index (both locks must be held).
+
+        Rows past the indexed length (left by a crash between writing vectors and the
+        index) are truncated so later appends line up with the index again; an index
+        that refers to missing rows resets the store.
+        """
+        if not self._index_path.exists():
+            self._vectors_path.unlink(missing_ok=True)
+            self.dim, self.rows = None, {}
+            return
+        try:
+            with open(self._index_path, "r") as file:
+                index = json.load(file)
+            dim, rows = index["dim"], index["rows"]
+            expected_size = (max(rows.values()) + 1 if rows else 0) * dim * np.dtype(np.float32).itemsize
+            actual_size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+            if actual_size < expected_size:
+                raise ValueError("vector file is shorter than the index")
+            if actual_size > expected_size:
+                logger.warning(f"Truncating {actual_size - expected_size} unindexed bytes from {self._vectors_path}")
+                os.truncate(self._vectors_path, expected_size)
+            if rows != self.rows:
+                self._matrix = None
+            self.dim, self.rows = dim, rows
+        except Exception as e:
+            logger.warning(f"Resetting embedding store at {self.directory}: {e}")
+            self._vectors_path.unlink(missing_ok=True)
+            self._index_path.unlink(missing_ok=True)
+            self.dim, self.rows, self._matrix = None, {}, None
+
+    def _save_index(self) -> None:
+        """Atomically write the hash index (lock must be held)"""
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump({"model": self.model, "dim": self.dim, "rows": self.rows}, file)
+        os.replace(tmp_path, self._index_path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_store(model: str = GPT_EMBEDDING_MODEL, base_url: Optional[str] = None) -> EmbeddingStore:
+    """Process-wide embedding store for a model; non-default endpoints get a separate store"""
+    directory = CACHE_DIR / "embeddings"
+    if base_url:
+        directory = directory / "endpoints" / hashlib.sha256(base_url.encode("utf-8")).hexdigest()[:16]
+    return EmbeddingStore(directory, model=model)
@@ -0,0 +1,400 @@
+'''
+---------------------------------
+File: fake_llm_server.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import json
+import time
+import base64
+import random
+import hashlib
+import logging
+import argparse
+import threading
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from pydantic import BaseModel, ValidationError
+
+from src.models.jobs import JobData
+from src.models.sections import Resume
+from src.utils.rate_limit import TokenBucket
+from src.envs import section_mapping
+
+
+logger = logging.getLogger(__name__)
+
+# Models the pipeline asks for, keyed by their top-level field names
+KNOWN_SCHEMAS: Dict[frozenset, Type[BaseModel]] = {
+    frozenset(model.model_fields): model
+    for model in [JobData, Resume] + [config["schema"] for config in section_mapping.values()]
+}
+
+CANNED_COVER_LETTER = (
+    "Dear Hiring Manager,\n\n"
+    "I am excited to apply for this role. My experience building reliable data pipelines and "
+    "APIs in Python maps directly onto the responsibilities in your posting, and I would welcome "
+    "the chance to bring that experience to your team.\n\n"
+    "Sincerely,\nCandidate"
+)
+
+SCHEMA_MARKER = "Here is the output schema:"
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec string.
+
+    Supported specs: "fixed:S", "uniform:LO,HI", "normal:MEAN,STD",
+    "lognormal:MU,SIGMA" (parameters of the underlying normal, in log-seconds).
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()] if params else []
+    if kind == "fixed":
+        seconds = values[0] if values else 0.0
+        return lambda: seconds
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def extract_output_schema(prompt: str) -> Optional[Dict[str, Any]]:
+    """JSON schema embedded in a prompt by JsonOutputParser.get_format_instructions()"""
+    start = prompt.rfind(SCHEMA_MARKER)
+    if start == -1:
+        return None
+    block = prompt[start + len(SCHEMA_MARKER):].split("```")
+    if len(block) < 2:
+        return None
+    try:
+        return json.loads(block[1])
+    except json.JSONDecodeError:
+        return None
+
+
+def example_value(schema: Dict[str, Any], defs: Dict[str, Any], name: str = "value") -> Any:
+    """Deterministic instance of a JSON schema node"""
+    if "$ref" in schema:
+        return example_value(defs[schema["$ref"].split("/")[-1]], defs, name)
+    if "allOf" in schema:
+        # Pydantic wraps a $ref that carries extra keywords (e.g. a description) in a one-element allOf
+        parts = [example_value(part, defs, name) for part in schema["allOf"]]
+        if all(isinstance(part, dict) for part in parts):
+            return {key: value for part in parts for key, value in part.items()}
+        return parts[0]
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return example_value(options[0], defs, name) if options else None
+
+    kind = schema.get("type")
+    if kind == "object" or "properties" in schema:
+        return {key: example_value(value, defs, key) for key, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example_value(schema.get("items", {}), defs, name) for _ in range(3)]
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return True
+
+    if schema.get("format") == "uri" or "url" in name or name in ("github", "linkedin", "medium", "devpost"):
+        return f"https://example.com/{name}"
+    if "email" in name:
+        return "candidate@example.com"
+    if "number" in name or "phone" in name:
+        return "+1 555 0100"
+    if name in ("start", "end"):
+        return "Jan 2024"
+    return f"Sample {name.replace('_', ' ')}"
+
+
+def canned_json(prompt: str) -> Dict[str, Any]:
+    """
+    Schema-valid JSON for the output schema requested in a prompt.
+
+    Raises:
+        ValueError: If the instance does not validate against the matching pipeline model.
+    """
+    schema = extract_output_schema(prompt)
+    if not schema:
+        return {"result": "Sample result"}
+
+    instance = example_value(schema, schema.get("$defs", {}))
+    model = KNOWN_SCHEMAS.get(frozenset(schema.get("properties", {})))
+    if model is not None:
+        try:
+            model.model_validate(instance)
+        except ValidationError as e:
+            raise ValueError(f"Canned response does not validate against {model.__name__}: {e}") from e
+    return instance
+
+
+def fake_embedding(text: str, dimensions: int) -> np.ndarray:
+    """Unit vector seeded by the text, so equal texts get equal embeddings"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class FakeLLMServer:
+    """
+    Local stand-in for the OpenAI /v1/chat/completions and /v1/embeddings endpoints.
+
+    Chat requests with response_format json_object get a deterministic instance of the
+    output schema embedded in the prompt (validated against JobData, Resume and the
+    section_mapping schemas); plain requests get a canned cover letter. Responses can be
+    delayed by a latency distribution plus simulated generation speed, and failed with
+    injected 500s, 429s, or real 429s when the configured RPM/TPM limits run out.
+
+    Usage:
+        with FakeLLMServer(latency="lognormal:-1,0.5") as server:
+            cv = AdaptiveCV(base_url=server.base_url)
+
+    Args:
+        host (str): Bind address.
+        port (int): Bind port, 0 picks a free one.
+        latency (str): Latency distribution spec, see parse_latency.
+        tokens_per_second (float, optional): Simulated completion speed; None disables it.
+        error_rate (float): Probability of an injected 500.
+        rate_limit_rate (float): Probability of an injected 429.
+        retry_after (float): Retry-After seconds sent with injected 429s.
+        rpm (int, optional): Requests-per-minute limit enforced with 429s.
+        tpm (int, optional): Tokens-per-minute limit enforced with 429s.
+        embedding_dim (int): Embedding vector size.
+        seed (int, optional): Seed for latency and error sampling.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: str = "fixed:0",
+                 tokens_per_second: Optional[float] = None,
+                 error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0,
+                 rpm: Optional[int] = None,
+                 tpm: Optional[int] = None,
+                 embedding_dim: int = 1536,
+                 seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.sample_latency = parse_latency(latency, self._rng)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rpm, self.tpm = rpm, tpm
+        self.requests = TokenBucket(rpm / 60.0, capacity=rpm) if rpm else None
+        self.tokens = TokenBucket(tpm / 60.0, capacity=tpm) if tpm else None
+        self.embedding_dim = embedding_dim
+        self.stats = {"chat": 0, "embeddings": 0, "errors": 0, "rate_limited": 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> bool:
+        self.stop()
+        return False
+
+    def _chance(self, probability: float) -> bool:
+        with self._rng_lock:
+            return probability > 0 and self._rng.random() < probability
+
+    def _latency(self) -> float:
+        with self._rng_lock:
+            return self.sample_latency()
+
+    def _admit(self, tokens: int) -> Optional[float]:
+        """None if within the RPM/TPM limits, else seconds until the request would fit"""
+        waits = []
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is None:
+                continue
+            wait = bucket.reserve(amount)
+            waits.append((bucket, amount, wait))
+        if any(wait > 0 for _, _, wait in waits):
+            for bucket, amount, _ in waits:
+                bucket.refund(amount)
+            return max(wait for _, _, wait in waits)
+        return None
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        headers = {}
+        for bucket, kind, limit in ((self.requests, "requests", self.rpm), (self.tokens, "tokens", self.tpm)):
+            if bucket is not None:
+                headers[f"x-ratelimit-limit-{kind}"] = str(limit)
+                headers[f"x-ratelimit-remaining-{kind}"] = str(max(0, int(bucket.available)))
+        return headers
+
+    def handle(self, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Route a request; returns (status, JSON body, extra headers)"""
+        if path.endswith("/chat/completions"):
+            prompt = "".join(message.get("content") or "" for message in body.get("messages", []))
+            prompt_tokens = estimate_tokens(prompt)
+            expected_completion = body.get("max_tokens") or 500
+        elif path.endswith("/embeddings"):
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            prompt_tokens = sum(estimate_tokens(str(text)) for text in inputs)
+            expected_completion = 0
+        else:
+            return 404, {"error": {"message": f"Unknown endpoint {path}", "type": "invalid_request_error"}}, {}
+
+        if self._chance(self.error_rate):
+            self.stats["errors"] += 1
+            return 500, {"error": {"message": "Injected server error", "type": "server_error"}}, {}
+
+        wait = self._admit(prompt_tokens + expected_completion)
+        if wait is not None or self._chance(self.rate_limit_rate):
+            self.stats["rate_limited"] += 1
+            retry_after = wait if wait is not None else self.retry_after
+            headers = {"retry-after": f"{retry_after:.3f}", **self._rate_limit_headers()}
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}, headers
+
+        time.sleep(self._latency())
+
+        if path.endswith("/embeddings"):
+            self.stats["embeddings"] += 1
+            return 200, self._embeddings(body, inputs, prompt_tokens), self._rate_limit_headers()
+
+        self.stats["chat"] += 1
+        return 200, self._chat(body, prompt, prompt_tokens), self._rate_limit_headers()
+
+    def _chat(self, body: Dict[str, Any], prompt: str, prompt_tokens: int) -> Dict[str, Any]:
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        content = json.dumps(canned_json(prompt)) if wants_json else CANNED_COVER_LETTER
+        completion_tokens = estimate_tokens(content)
+        if self.tokens_per_second:
+            time.sleep(completion_tokens / self.tokens_per_second)
+
+        return {
+            "id": f"chatcmpl-fake-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _embeddings(self, body: Dict[str, Any], inputs: List[Any], prompt_tokens: int) -> Dict[str, Any]:
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(str(text), self.embedding_dim)
+            embedding = base64.b64encode(vector.tobytes()).decode("ascii") if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        }
+
+    def _handler_class(self) -> Type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send(400, {"error": {"message": "Invalid JSON", "type": "invalid_request_error"}}, {})
+                    return
+                self._send(*server.handle(self.path, body))
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Dict[str, str]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stand-in server")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=str, default="fixed:0", help="fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MU,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Simulated completion speed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds for injected 429s")
+    parser.add_argument("--rpm", type=int, default=None, help="Requests-per-minute limit")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens-per-minute limit")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    fake_server = FakeLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        seed=args.seed,
+    )
+    print(f"Fake LLM server listening on {fake_server.base_url} (export ADAPTIVECV_LLM_BASE_URL={fake_server.base_url})")
+    try:
+        fake_server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake_server.httpd.server_close()
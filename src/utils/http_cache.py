@@ -0,0 +1,297 @@
+'''
+---------------------------------
+File: http_cache.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+import functools
+import contextlib
+
+from typing import Dict, NamedTuple, Optional, Union
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from src.utils.rate_limit import HostLimiter
+from src.envs import (
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_FRESHNESS,
+    HTTP_POOL_SIZE,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_MAX_AGE,
+    HTTP_CACHE_SWEEP_INTERVAL,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Ad/email click identifiers that never change the page. Generic names such as ref, src,
+# refid or trk are kept: job boards use them to select the posting that is served.
+TRACKING_PARAMS = {
+    "gclid", "gbraid", "wbraid", "dclid", "fbclid", "msclkid", "yclid", "twclid", "ttclid",
+    "li_fat_id", "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    # gzip/deflate always, br/zstd when the decoders are installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for caching and deduplication.
+
+    Lowercases scheme and host, drops default ports, fragments and click-tracking query
+    parameters, and sorts the remaining parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class FetchResult(NamedTuple):
+    """Response body and how it was obtained"""
+    url: str
+    status: int
+    content: bytes
+    headers: Dict[str, str]
+    from_cache: bool
+    revalidated: bool
+
+
+class HttpFetcher:
+    """
+    HTTP GET with a pooled keep-alive session and an on-disk cache.
+
+    Bodies are stored with their validators (ETag / Last-Modified) in a directory sharded
+    by URL hash. Within the freshness window (Cache-Control max-age, or `freshness`) the
+    cached body is returned without any request; afterwards the URL is revalidated with a
+    conditional request, and a 304 reuses the stored body. After writes, a periodic sweep
+    removes entries unused for `max_age` seconds and then the least recently used ones
+    until the cache fits in `max_bytes`.
+
+    Args:
+        cache_dir (Union[str, Path], optional): Cache directory. Defaults to HTTP_CACHE_DIR.
+        freshness (float, optional): Default freshness window in seconds. Defaults to HTTP_CACHE_FRESHNESS.
+        pool_size (int, optional): Keep-alive connections per host. Defaults to HTTP_POOL_SIZE.
+        max_bytes (int, optional): Maximum total size of cached entries. Defaults to HTTP_CACHE_MAX_BYTES.
+        max_age (float, optional): Seconds an unused entry is kept. Defaults to HTTP_CACHE_MAX_AGE.
+    """
+
+    def __init__(self,
+                 cache_dir: Union[str, Path] = HTTP_CACHE_DIR,
+                 freshness: float = HTTP_CACHE_FRESHNESS,
+                 pool_size: int = HTTP_POOL_SIZE,
+                 max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 max_age: float = HTTP_CACHE_MAX_AGE):
+        self.cache_dir = Path(cache_dir)
+        self.freshness = freshness
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._sweep_lock = threading.Lock()
+        self._last_sweep = 0.0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+    def fetch(self, url: str, timeout: float = 10, max_age: Optional[float] = None, limiter: Optional[HostLimiter] = None) -> FetchResult:
+        """
+        Fetch a URL through the cache.
+
+        Args:
+            url (str): URL to fetch, normalized before use.
+            timeout (float, optional): Request timeout in seconds. Defaults to 10.
+            max_age (float, optional): Override of the freshness window, 0 forces revalidation.
+            limiter (HostLimiter, optional): Per-host limits applied to the network request only,
+                so fresh cache hits cost no rate budget.
+
+        Returns:
+            FetchResult: Body and cache status.
+
+        Raises:
+            requests.HTTPError: For non-success responses.
+        """
+        url = normalize_url(url)
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        entry = self._load(key)
+        now = time.time()
+
+        if entry is not None:
+            fresh_for = entry["max_age"] if max_age is None else max_age
+            if now - entry["fetched_at"] < fresh_for:
+                logger.debug(f"HTTP cache hit (fresh): {url}")
+                self._touch(key)
+                return FetchResult(url, entry["status"], self._read_body(key), entry["headers"], True, False)
+
+        headers = {}
+        if entry is not None:
+            if entry["headers"].get("etag"):
+                headers["If-None-Match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+
+        slot = limiter.limit(urlsplit(url).netloc) if limiter is not None else contextlib.nullcontext()
+        with slot:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            entry["fetched_at"] = now
+            entry["max_age"] = self._freshness_of(response, default=entry["max_age"])
+            self._save(key, entry)
+            return FetchResult(url, entry["status"], self._read_body(key), entry["headers"], True, True)
+
+        response.raise_for_status()
+
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-store" not in cache_control:
+            entry = {
+                "url": url,
+                "status": response.status_code,
+                "headers": {
+                    name: response.headers[name]
+                    for name in ("content-type", "etag", "last-modified")
+                    if name in response.headers
+                },
+                "fetched_at": now,
+                "max_age": self._freshness_of(response, default=self.freshness),
+            }
+            self._write_body(key, response.content)
+            self._save(key, entry)
+            self._maybe_sweep()
+
+        return FetchResult(url, response.status_code, response.content, dict(response.headers), False, False)
+
+    def _freshness_of(self, response: requests.Response, default: float) -> float:
+        """Freshness window from Cache-Control, falling back to the default"""
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if "no-cache" in cache_control:
+            return 0
+        match = MAX_AGE_PATTERN.search(cache_control)
+        return float(match.group(1)) if match else default
+
+    def _paths(self, key: str):
+        shard = self.cache_dir / key[:2]
+        return shard / f"{key}.json", shard / f"{key}.body"
+
+    def _load(self, key: str) -> Optional[Dict]:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as file:
+                entry = json.load(file)
+            return entry if body_path.exists() else None
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key: str, entry: Dict) -> None:
+        meta_path, _ = self._paths(key)
+        self._atomic_write(meta_path, json.dumps(entry).encode("utf-8"))
+
+    def _read_body(self, key: str) -> bytes:
+        _, body_path = self._paths(key)
+        return body_path.read_bytes()
+
+    def _write_body(self, key: str, content: bytes) -> None:
+        _, body_path = self._paths(key)
+        self._atomic_write(body_path, content)
+
+    def _touch(self, key: str) -> None:
+        """Mark an entry as used; the metadata mtime orders eviction"""
+        meta_path, _ = self._paths(key)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+    def _maybe_sweep(self) -> None:
+        """Run an eviction sweep at most once per HTTP_CACHE_SWEEP_INTERVAL"""
+        now = time.monotonic()
+        if now - self._last_sweep < HTTP_CACHE_SWEEP_INTERVAL or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    def sweep(self) -> int:
+        """
+        Remove expired entries, then least recently used ones above max_bytes.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        now = time.time()
+        entries = []
+        for meta_path in self.cache_dir.glob("*/*.json"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                used = meta_path.stat().st_mtime
+                size = meta_path.stat().st_size + (body_path.stat().st_size if body_path.exists() else 0)
+            except FileNotFoundError:
+                continue
+            entries.append((used, size, meta_path, body_path))
+
+        entries.sort(key=lambda entry: entry[0])
+        total = sum(size for _, size, _, _ in entries)
+        removed = 0
+        for used, size, meta_path, body_path in entries:
+            if now - used <= self.max_age and total <= self.max_bytes:
+                break
+            meta_path.unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.debug(f"Evicted {removed} entries from the HTTP cache")
+        return removed
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_fetcher() -> HttpFetcher:
+    """Process-wide HTTP fetcher sharing one connection pool and cache"""
+    return HttpFetcher()
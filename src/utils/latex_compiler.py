@@ -0,0 +1,402 @@
+'''
+---------------------------------
+File: latex_compiler.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import os
+import re
+import time
+import atexit
+import shutil
+import asyncio
+import logging
+import tempfile
+import threading
+import subprocess
+
+from pathlib import Path
+from typing import FrozenSet, List, NamedTuple, Optional, Set, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.utils.cache import file_sha256, make_cache_key
+from src.envs import (
+    TEMPLATES_DIR,
+    LATEX_MAX_WORKERS,
+    LATEX_TIMEOUT,
+    LATEX_MAX_OUTPUT_BYTES,
+    LATEX_MAX_PASSES,
+    LATEX_PRECOMPILED_FORMAT,
+    LATEX_FORMAT_DIR,
+)
+
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "resume"
+SUPPORT_FILES = ["resume.cls"]
+FORMAT_NAME = "resume-preamble"
+
+# The template's static preamble ends where the first per-resume content starts
+PREAMBLE_END_MARKER = "%==== Headings ====%"
+
+# Log messages that mean another pass would change the output
+RERUN_PATTERN = re.compile(
+    r"Rerun to get|Label\(s\) may have changed|There were undefined references|"
+    r"Rerun LaTeX|Please rerun LaTeX|\(rerunfilecheck\)"
+)
+# .aux lines later passes read back (labels, citations, toc/lof entries). The kernel's
+# \gdef \@abspage@last line is left out: it is written on every run, and page-count
+# changes that matter are reported as "Rerun" warnings in the log
+AUX_REFERENCE_PREFIXES = ("\\newlabel", "\\bibcite", "\\@writefile")
+
+
+class CompileResult(NamedTuple):
+    """Outcome of a compile job"""
+    pdf_path: Optional[str]
+    passes: int
+    seconds: float
+    precompiled: bool = False
+
+
+def split_preamble(tex_source: str) -> Optional[Tuple[str, str]]:
+    """Split a rendered resume into (static preamble, body); None when there is no preamble marker"""
+    index = tex_source.find(PREAMBLE_END_MARKER)
+    if index <= 0:
+        return None
+    preamble, body = tex_source[:index], tex_source[index:]
+    if "\\begin{document}" in preamble:
+        return None
+    return preamble, body
+
+
+def link_file(source: Path, target: Path) -> None:
+    """Symlink source to target, copying where symlinks are unavailable"""
+    try:
+        os.symlink(source, target)
+    except (OSError, NotImplementedError):
+        shutil.copy2(source, target)
+
+
+def link_support_files(templates_dir: Path, workdir: Path) -> None:
+    """Make the class file available in a job directory"""
+    for name in SUPPORT_FILES:
+        link_file(templates_dir / name, workdir / name)
+
+
+class FormatCache:
+    """
+    Dumped pdflatex formats of the template preamble.
+
+    Loading resume.cls, geometry, fontawesome, hyperref etc. dominates the time of a
+    one-page compile. The preamble is compiled once with `pdflatex -ini "&pdflatex"`
+    and `\\dump`ed to a .fmt file, which later compiles load instead of re-reading the
+    packages. Formats are keyed by the class file hash, the preamble text and the TeX
+    version, so editing the template or upgrading TeX builds a fresh one. A preamble that
+    fails to build is remembered and compiled the normal way from then on.
+
+    Args:
+        templates_dir (Path): Directory holding resume.cls.
+        cache_dir (Path): Where .fmt files are kept.
+        engine (str): LaTeX binary.
+        timeout (float): Seconds allowed for the format build.
+    """
+
+    def __init__(self, templates_dir: Path, cache_dir: Path, engine: str, timeout: float):
+        self.templates_dir = Path(templates_dir)
+        self.cache_dir = Path(cache_dir)
+        self.engine = engine
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._failed: Set[str] = set()
+        self._version: Optional[str] = None
+
+    def key(self, preamble: str) -> Optional[str]:
+        version = self.tex_version()
+        if version is None:
+            return None
+        classes = {name: file_sha256(self.templates_dir / name) for name in SUPPORT_FILES}
+        return make_cache_key("latex-format", self.engine, version, classes, preamble)
+
+    def tex_version(self) -> Optional[str]:
+        """First line of `pdflatex --version`, or None when the engine is unavailable"""
+        if self._version is None:
+            try:
+                result = subprocess.run([self.engine, "--version"], stdin=subprocess.DEVNULL,
+                                        capture_output=True, timeout=self.timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                return None
+            lines = result.stdout.decode("utf-8", errors="replace").splitlines()
+            if result.returncode != 0 or not lines:
+                return None
+            self._version = lines[0].strip()
+        return self._version
+
+    def get(self, preamble: str) -> Optional[Path]:
+        """Path to the format for this preamble, building it on first use; None if unavailable"""
+        key = self.key(preamble)
+        if key is None or key in self._failed:
+            return None
+
+        fmt_path = self.cache_dir / f"{key}.fmt"
+        if fmt_path.exists():
+            return fmt_path
+
+        with self._lock:
+            if fmt_path.exists():
+                return fmt_path
+            if key in self._failed:
+                return None
+            if self._build(preamble, fmt_path):
+                return fmt_path
+            self._failed.add(key)
+            return None
+
+    def invalidate(self, fmt_path: Path) -> None:
+        """Drop a format that failed to load, so the next compiles take the normal path"""
+        with self._lock:
+            self._failed.add(fmt_path.stem)
+            fmt_path.unlink(missing_ok=True)
+
+    def _build(self, preamble: str, fmt_path: Path) -> bool:
+        start_time = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="adaptivecv-latex-fmt-") as workdir:
+            workdir = Path(workdir)
+            link_support_files(self.templates_dir, workdir)
+            (workdir / f"{FORMAT_NAME}.tex").write_text(preamble + "\n\\dump\n", encoding="utf-8")
+            command = [self.engine, "-ini", "-interaction=nonstopmode", f"-jobname={FORMAT_NAME}",
+                       f"&{self.engine}", f"{FORMAT_NAME}.tex"]
+            try:
+                result = subprocess.run(command, cwd=workdir, stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=self.timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"Could not build {self.engine} format: {e}")
+                return False
+
+            built = workdir / f"{FORMAT_NAME}.fmt"
+            if result.returncode != 0 or not built.exists():
+                tail = result.stdout[-1000:].decode("utf-8", errors="replace")
+                logger.warning(f"Building {self.engine} format failed, compiling without it: {tail}")
+                return False
+
+            # Publish atomically so concurrent processes never load a half-written format
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            staging = self.cache_dir / f".{fmt_path.name}.{os.getpid()}.tmp"
+            shutil.copyfile(built, staging)
+            os.replace(staging, fmt_path)
+
+        logger.info(f"Built {self.engine} format {fmt_path.name} in {time.perf_counter() - start_time:.2f}s")
+        return True
+
+
+class LatexCompiler:
+    """
+    Compiles LaTeX sources to PDF on a bounded worker pool.
+
+    Each job runs in its own temporary directory with the template support files
+    (resume.cls) symlinked in, so concurrent renders never share a working directory
+    and nothing depends on the process-wide CWD. Every pdflatex pass has a timeout and
+    the produced PDF must stay under a size cap. With `precompile`, the static preamble
+    is loaded from a cached format (see FormatCache) and only the body is typeset.
+
+    Args:
+        templates_dir (Union[str, Path], optional): Directory holding resume.cls. Defaults to TEMPLATES_DIR.
+        max_workers (int, optional): Concurrent compile jobs. Defaults to LATEX_MAX_WORKERS.
+        timeout (float, optional): Seconds allowed per pdflatex pass. Defaults to LATEX_TIMEOUT.
+        max_output_bytes (int, optional): Largest accepted PDF. Defaults to LATEX_MAX_OUTPUT_BYTES.
+        engine (str, optional): LaTeX binary. Defaults to "pdflatex".
+        max_passes (int, optional): Pass limit for reference convergence. Defaults to LATEX_MAX_PASSES.
+        precompile (bool, optional): Compile against a dumped preamble format. Defaults to LATEX_PRECOMPILED_FORMAT.
+        format_dir (Union[str, Path], optional): Format cache directory. Defaults to LATEX_FORMAT_DIR.
+    """
+
+    def __init__(self,
+                 templates_dir: Union[str, Path] = TEMPLATES_DIR,
+                 max_workers: int = LATEX_MAX_WORKERS,
+                 timeout: float = LATEX_TIMEOUT,
+                 max_output_bytes: int = LATEX_MAX_OUTPUT_BYTES,
+                 engine: str = "pdflatex",
+                 max_passes: int = LATEX_MAX_PASSES,
+                 precompile: bool = LATEX_PRECOMPILED_FORMAT,
+                 format_dir: Union[str, Path] = LATEX_FORMAT_DIR):
+        self.templates_dir = Path(templates_dir)
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.engine = engine
+        self.max_passes = max(1, max_passes)
+        self.formats = FormatCache(self.templates_dir, Path(format_dir), engine, timeout) if precompile else None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="latex")
+        self._stats_lock = threading.Lock()
+        self.stats = {"jobs": 0, "failed": 0, "precompiled": 0, "passes": 0, "seconds": 0.0}
+
+    def submit(self, tex_source: str, dst_path: str) -> "Future[CompileResult]":
+        """Queue a compile job"""
+        return self._executor.submit(self._compile_job, tex_source, dst_path)
+
+    def compile(self, tex_source: str, dst_path: str) -> CompileResult:
+        """
+        Compile a LaTeX source to dst_path, waiting for a free worker.
+
+        The .tex source is written next to the PDF (dst_path with a .tex suffix).
+        pdflatex is rerun only while the .aux cross-references change or the log asks
+        for a rerun, up to max_passes.
+
+        Returns:
+            CompileResult: pdf_path (None on failure), the number of passes and wall time.
+        """
+        return self.submit(tex_source, dst_path).result()
+
+    async def acompile(self, tex_source: str, dst_path: str) -> CompileResult:
+        """Async version of compile; the event loop is not blocked while pdflatex runs"""
+        return await asyncio.wrap_future(self.submit(tex_source, dst_path))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _compile_job(self, tex_source: str, dst_path: str) -> CompileResult:
+        start_time = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="adaptivecv-latex-") as workdir:
+            workdir = Path(workdir)
+            link_support_files(self.templates_dir, workdir)
+
+            passes, precompiled = 0, False
+            fmt_path, parts = self._format_for(tex_source)
+            if fmt_path is not None:
+                link_file(fmt_path, workdir / f"{FORMAT_NAME}.fmt")
+                (workdir / f"{JOB_NAME}.tex").write_text(parts[1], encoding="utf-8")
+                ok, passes = self._run_passes(workdir, self._command(FORMAT_NAME))
+                precompiled = ok and (workdir / f"{JOB_NAME}.pdf").exists()
+                if not precompiled:
+                    logger.warning(f"Compiling {dst_path} against {fmt_path.name} failed, retrying without the format")
+                    # TeX stops before opening the log when the format itself cannot be loaded (stale or corrupt)
+                    if not (workdir / f"{JOB_NAME}.log").exists():
+                        self.formats.invalidate(fmt_path)
+                    self._clean_outputs(workdir)
+
+            if not precompiled:
+                (workdir / f"{JOB_NAME}.tex").write_text(tex_source, encoding="utf-8")
+                ok, full_passes = self._run_passes(workdir, self._command())
+                passes += full_passes
+                if not ok:
+                    return self._record(CompileResult(None, passes, time.perf_counter() - start_time))
+
+            pdf_path = self._collect(workdir, tex_source, dst_path)
+
+        result = self._record(CompileResult(pdf_path, passes, time.perf_counter() - start_time, precompiled))
+        logger.info(f"Compiled {dst_path} with {passes} {self.engine} pass{'es' if passes > 1 else ''} "
+                    f"{'(precompiled preamble) ' if precompiled else ''}in {result.seconds:.2f}s")
+        return result
+
+    def _format_for(self, tex_source: str) -> Tuple[Optional[Path], Optional[Tuple[str, str]]]:
+        if self.formats is None:
+            return None, None
+        parts = split_preamble(tex_source)
+        if parts is None:
+            return None, None
+        return self.formats.get(parts[0]), parts
+
+    def _run_passes(self, workdir: Path, command: List[str]) -> Tuple[bool, int]:
+        """Run LaTeX until references converge; returns (success, passes run)"""
+        passes = 0
+        references: FrozenSet[str] = frozenset()
+        while passes < self.max_passes:
+            passes += 1
+            logger.debug(f"Running {self.engine} pass {passes} in {workdir}")
+            if not self._run_pass(workdir, command):
+                return False, passes
+
+            # latexmk-style convergence: stop once a pass saw the references it wrote
+            previous, references = references, self._aux_references(workdir)
+            if references == previous and not self._needs_rerun(workdir):
+                break
+        return True, passes
+
+    @staticmethod
+    def _clean_outputs(workdir: Path) -> None:
+        for suffix in (".aux", ".log", ".out", ".pdf"):
+            (workdir / f"{JOB_NAME}{suffix}").unlink(missing_ok=True)
+
+    def _record(self, result: CompileResult) -> CompileResult:
+        with self._stats_lock:
+            self.stats["jobs"] += 1
+            self.stats["failed"] += result.pdf_path is None
+            self.stats["precompiled"] += result.precompiled
+            self.stats["passes"] += result.passes
+            self.stats["seconds"] += result.seconds
+        return result
+
+    @staticmethod
+    def _aux_references(workdir: Path) -> FrozenSet[str]:
+        """Cross-reference lines of the .aux file, the state a later pass would read back"""
+        aux_path = workdir / f"{JOB_NAME}.aux"
+        if not aux_path.exists():
+            return frozenset()
+        lines = aux_path.read_text(encoding="utf-8", errors="replace").splitlines()
+        return frozenset(line for line in lines if line.startswith(AUX_REFERENCE_PREFIXES))
+
+    @staticmethod
+    def _needs_rerun(workdir: Path) -> bool:
+        log_path = workdir / f"{JOB_NAME}.log"
+        if not log_path.exists():
+            return False
+        return bool(RERUN_PATTERN.search(log_path.read_text(encoding="utf-8", errors="replace")))
+
+    def _command(self, fmt: Optional[str] = None) -> List[str]:
+        fmt_args = [f"-fmt={fmt}"] if fmt else []
+        return [self.engine, "-interaction=nonstopmode", *fmt_args, f"{JOB_NAME}.tex"]
+
+    def _run_pass(self, workdir: Path, command: List[str]) -> bool:
+        """Run one LaTeX pass; False when it timed out or could not start"""
+        try:
+            result = subprocess.run(
+                command,
+                cwd=workdir,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            logger.error(f"{self.engine} timed out after {self.timeout:g}s")
+            return False
+        except FileNotFoundError:
+            logger.error(f"{self.engine} is not installed or not on PATH")
+            return False
+
+        if result.returncode != 0:
+            tail = result.stdout[-1000:].decode("utf-8", errors="replace")
+            logger.warning(f"{self.engine} returned non-zero exit code {result.returncode}: {tail}")
+        return True
+
+    def _collect(self, workdir: Path, tex_source: str, dst_path: str) -> Optional[str]:
+        """Move the PDF to dst_path and write the .tex beside it"""
+        pdf_path = workdir / f"{JOB_NAME}.pdf"
+        if not pdf_path.exists():
+            logger.error(f"PDF was not produced for {dst_path}")
+            return None
+
+        size = pdf_path.stat().st_size
+        if size > self.max_output_bytes:
+            logger.error(f"PDF for {dst_path} is {size} bytes, over the {self.max_output_bytes} byte cap")
+            return None
+
+        os.makedirs(os.path.dirname(os.path.abspath(dst_path)), exist_ok=True)
+        shutil.move(str(pdf_path), dst_path)
+        Path(dst_path).with_suffix(".tex").write_text(tex_source, encoding="utf-8")
+        return dst_path
+
+
+_compiler: Optional[LatexCompiler] = None
+_compiler_lock = threading.Lock()
+
+
+def get_latex_compiler() -> LatexCompiler:
+    """Process-wide compile service"""
+    global _compiler
+    with _compiler_lock:
+        if _compiler is None:
+            _compiler = LatexCompiler()
+            atexit.register(_compiler.close)
+        return _compiler
@@ -8,12 +8,12 @@ Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
 '''
 
 import os
+import asyncio
 import jinja2
 import logging
-import subprocess
-import shutil
+import threading
 
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from pathlib import Path
 import traceback
 
@@ -24,11 +24,35 @@ from src.utils.utils import (
     error_handler,
     timer_decoder
 )
+from src.utils.cache import RenderCache, file_sha256, make_cache_key
+from src.utils.latex_compiler import SUPPORT_FILES, CompileResult, get_latex_compiler
+from src.envs import TEMPLATES_DIR, LATEX_BYTECODE_CACHE_DIR, LATEX_RENDER_DEBUG
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+TEMPLATE_NAME = "resume.tex.jinja"
+
+# Adapted from https://stackoverflow.com/q/16259923
+LATEX_SPECIAL_CHARS = str.maketrans({
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\^{}",
+    "\\": r"\textbackslash{}",
+    "\n": "\\newline%\n",
+    "-": r"{-}",
+    "\xA0": "~",  # Non-breaking space
+    "[": r"{[}",
+    "]": r"{]}",
+})
+
 
 class LatexProcessor:
     """Latex Processing functions"""
@@ -45,48 +69,33 @@ class LatexProcessor:
             Escaped data with LaTeX special characters properly handled
         """
 
-        if isinstance(data, dict):
-            new_data = {}
-            for key in data.keys():
-                new_data[key] = LatexProcessor.escape_for_latex(data[key])
-            return new_data
+        if isinstance(data, str):
+            return data.translate(LATEX_SPECIAL_CHARS)
+        elif isinstance(data, dict):
+            return {key: LatexProcessor.escape_for_latex(value) for key, value in data.items()}
         elif isinstance(data, list):
             return [LatexProcessor.escape_for_latex(item) for item in data]
-        elif isinstance(data, str):
-            # Adapted from https://stackoverflow.com/q/16259923
-            latex_special_chars = {
-                "&": r"\&",
-                "%": r"\%",
-                "$": r"\$",
-                "#": r"\#",
-                "_": r"\_",
-                "{": r"\{",
-                "}": r"\}",
-                "~": r"\textasciitilde{}",
-                "^": r"\^{}",
-                "\\": r"\textbackslash{}",
-                "\n": "\\newline%\n",
-                "-": r"{-}",
-                "\xA0": "~",  # Non-breaking space
-                "[": r"{[}",
-                "]": r"{]}",
-            }
-            return "".join([latex_special_chars.get(c, c) for c in data])
 
         return data
 
     @staticmethod
     @error_handler
-    def get_jinja_env(templates_path: str) -> jinja2.Environment:
+    def get_jinja_env(templates_path: str, bytecode_cache_dir: Optional[Union[str, Path]] = None) -> jinja2.Environment:
         """
         Creates and configures a Jinja2 environment for LaTeX templates
         
         Args:
             templates_path: Path to the template directory
+            bytecode_cache_dir: Optional directory for Jinja's on-disk compiled template cache
             
         Returns:
             Configured Jinja2 Environment
         """
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_dir))
+
         return jinja2.Environment(
             block_start_string="\BLOCK{",
             block_end_string="}",
@@ -99,6 +108,7 @@ class LatexProcessor:
             trim_blocks=True,
             autoescape=False,
             loader=jinja2.FileSystemLoader(templates_path),
+            bytecode_cache=bytecode_cache,
         )
     
 
@@ -109,30 +119,12 @@ class LatexProcessor:
         Renders the resume template with the provided JSON data
         """
         try:
-            # Print available templates for debugging
-            templates = jinja_env.list_templates()
-            print(f"Available templates: {templates}")
-            
-            if "resume.tex.jinja" not in templates:
-                print("Error: resume.tex.jinja template not found!")
-                return None
-                
-            resume_template = jinja_env.get_template("resume.tex.jinja")
-            
-            # Print resume data keys for debugging
-            print(f"Resume data keys: {json_resume.keys()}")
-            if 'personal' in json_resume:
-                print(f"Personal data keys: {json_resume['personal'].keys()}")
+            resume_template = jinja_env.get_template(TEMPLATE_NAME)
+            logger.debug(f"Resume data keys: {json_resume.keys()}")
             
             # Render the template
             resume = resume_template.render(**json_resume)
             
-            # Write intermediate file for debugging
-            debug_file = "debug_template_output.tex"
-            with open(debug_file, "w") as f:
-                f.write(resume)
-            print(f"Wrote debug output to {debug_file}")
-            
             return resume
         except Exception as e:
             print(f"Error rendering Latex template: {str(e)}")
@@ -142,61 +134,22 @@ class LatexProcessor:
     @staticmethod
     @error_handler
     def save_latex_as_pdf(tex_file_path: str, dst_path: str) -> Optional[str]:
-        """Convert Latex to PDF using pdflatex"""
-        try:
-            prev_loc = os.getcwd()
-            tex_dir = os.path.dirname(tex_file_path)
-            tex_filename = os.path.basename(tex_file_path)
-            
-            # Change to the directory containing the .tex file
-            os.chdir(tex_dir)
-            
-            # Run pdflatex twice to resolve references
-            for i in range(2):
-                print(f"Running pdflatex iteration {i+1}...")
-                result = subprocess.run(
-                    ["pdflatex", "-interaction=nonstopmode", tex_filename],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                # Print output for debugging
-                print(f"pdflatex stdout: {result.stdout[:500]}...")  # Print first 500 chars
-                print(f"pdflatex stderr: {result.stderr}")
-                
-                if result.returncode != 0:
-                    print(f"pdflatex returned non-zero exit code: {result.returncode}")
-            
-            # Change back to original directory
-            os.chdir(prev_loc)
-            
-            # Paths for generated files
-            resulted_pdf_path = tex_file_path.replace(".tex", ".pdf")
-            dst_tex_path = dst_path.replace(".pdf", ".tex")
-            
-            # Check if PDF was actually created
-            if not os.path.exists(resulted_pdf_path):
-                print(f"Error: PDF file was not created at {resulted_pdf_path}")
-                return None
-                
-            # Move the files
-            shutil.move(resulted_pdf_path, dst_path)
-            shutil.move(tex_file_path, dst_tex_path)
-            
-            # Clean up auxiliary files
-            filename_without_ext = os.path.splitext(tex_filename)[0]
-            for ext in ['.aux', '.log', '.out', '.toc']:
-                aux_file = os.path.join(tex_dir, f"{filename_without_ext}{ext}")
-                if os.path.exists(aux_file):
-                    os.remove(aux_file)
-                    
-            return dst_path
-            
-        except Exception as e:
-            print(f"Exception in save_latex_as_pdf: {str(e)}")
-            traceback.print_exc()
-            return None
+        """Convert a .tex file to PDF at dst_path; the .tex is moved next to the PDF"""
+        tex_source = Path(tex_file_path).read_text(encoding="utf-8")
+        pdf_path = get_latex_compiler().compile(tex_source, dst_path).pdf_path
+        if pdf_path and os.path.abspath(tex_file_path) != os.path.abspath(Path(dst_path).with_suffix(".tex")):
+            os.remove(tex_file_path)
+        return pdf_path
+
+    @staticmethod
+    @error_handler
+    async def asave_latex_as_pdf(tex_file_path: str, dst_path: str) -> Optional[str]:
+        """Async version of save_latex_as_pdf"""
+        tex_source = await asyncio.to_thread(Path(tex_file_path).read_text, encoding="utf-8")
+        pdf_path = (await get_latex_compiler().acompile(tex_source, dst_path)).pdf_path
+        if pdf_path and os.path.abspath(tex_file_path) != os.path.abspath(Path(dst_path).with_suffix(".tex")):
+            os.remove(tex_file_path)
+        return pdf_path
         
     @staticmethod
     def validate_resume_data(json_resume: Dict) -> bool:
@@ -219,87 +172,204 @@ class LatexProcessor:
         return True
     
 
-@timer_decoder
-@error_handler
-def latex_to_pdf(json_resume: Dict, dst_path: str) -> Optional[str]:
+class ResumeRenderer:
     """
-    Converts JSON resume data to a PDF document via LaTeX
-    
+    Renders resume data with a template that is loaded and compiled once.
+
+    The Jinja environment and template are built on construction (optionally backed by
+    Jinja's on-disk bytecode cache, so new processes skip template compilation too), and
+    each render only escapes, validates and renders. With `debug`, every rendered source
+    is also written to `debug_path`.
+
     Args:
-        json_resume: Resume data in dictionary format
-        dst_path: Destination path for the PDF file
-        
-    Returns:
-        LaTeX content as string if successful, None otherwise
+        templates_dir (Union[str, Path], optional): Template directory. Defaults to TEMPLATES_DIR.
+        template_name (str, optional): Template file. Defaults to TEMPLATE_NAME.
+        bytecode_cache_dir (Union[str, Path], optional): Jinja bytecode cache, None to disable. Defaults to LATEX_BYTECODE_CACHE_DIR.
+        debug (bool, optional): Dump each rendered .tex and log the data keys. Defaults to LATEX_RENDER_DEBUG.
+        debug_path (Union[str, Path], optional): Debug dump location. Defaults to "debug_template_output.tex".
+
+    Raises:
+        FileNotFoundError: If the template directory or file does not exist.
     """
 
-    # try:
-    # Template dir
-    module_dir = os.path.dirname(__file__)
-    templates_path = os.path.join(os.path.dirname(module_dir), 'templates')
+    def __init__(self,
+                 templates_dir: Union[str, Path] = TEMPLATES_DIR,
+                 template_name: str = TEMPLATE_NAME,
+                 bytecode_cache_dir: Optional[Union[str, Path]] = LATEX_BYTECODE_CACHE_DIR,
+                 debug: bool = LATEX_RENDER_DEBUG,
+                 debug_path: Union[str, Path] = "debug_template_output.tex"):
+        self.templates_dir = Path(templates_dir)
+        self.template_path = self.templates_dir / template_name
+        if not self.templates_dir.is_dir():
+            raise FileNotFoundError(f"Templates directory does not exist: {self.templates_dir}")
+        if not self.template_path.is_file():
+            raise FileNotFoundError(f"Template file does not exist: {self.template_path}")
 
-    # Make sure templates directory exists
-    # print(f"Templates path: {templates_path}")
-    if not os.path.exists(templates_path):
-        print(f"Error: Templates directory does not exist: {templates_path}")
-        return None
+        # An unusable bytecode cache directory falls back to compiling in memory
+        env = (LatexProcessor.get_jinja_env(str(self.templates_dir), bytecode_cache_dir)
+               or LatexProcessor.get_jinja_env(str(self.templates_dir)))
+        self.template = env.get_template(template_name)
+        self.template_hash = file_sha256(self.template_path)
+        self.debug = debug
+        self.debug_path = Path(debug_path)
 
-    # Check if resume.tex.jinja exists
-    template_file = os.path.join(templates_path, "resume.tex.jinja")
-    if not os.path.exists(template_file):
-        print(f"Error: Template file does not exist: {template_file}")
-        return None
+    def render(self, json_resume: Dict) -> Optional[str]:
+        """
+        Escape, validate and render resume data.
 
-    # Create Jinja environment
-    # print("Setting up Jinja environment...")
-    latex_jinja_env = LatexProcessor.get_jinja_env(templates_path)
-    if not latex_jinja_env:
-        print("Failed to create Jinja environment")
-        return None
+        Args:
+            json_resume (Dict): Resume data.
 
-    # Print JSON resume structure before escaping (for debugging)
-    # print("Original JSON structure:")
-    # print(f"Keys: {json_resume.keys()}")
+        Returns:
+            Optional[str]: LaTeX source, or None if the data is invalid.
+        """
+        return self.render_escaped(LatexProcessor.escape_for_latex(json_resume))
 
-    # Escape Latex special characters
-    # print("Escaping LaTeX special characters...")
-    escaped_json_resume = LatexProcessor.escape_for_latex(json_resume)
+    def cache_key(self, escaped_json_resume: Dict) -> str:
+        """Render cache key: the escaped data plus the template and class file hashes"""
+        classes = {name: file_sha256(self.templates_dir / name) for name in SUPPORT_FILES}
+        return make_cache_key("latex-render", escaped_json_resume, self.template_hash, classes)
+
+    def render_escaped(self, escaped_json_resume: Dict) -> Optional[str]:
+        """Validate and render resume data that is already LaTeX-escaped"""
+        if not LatexProcessor.validate_resume_data(escaped_json_resume):
+            return None
+
+        resume_latex = self.template.render(**escaped_json_resume)
 
-    # Validate the data
-    if not LatexProcessor.validate_resume_data(escaped_json_resume):
-        print("Invalid resume data")
+        if self.debug:
+            logger.debug(f"Resume data keys: {list(escaped_json_resume.keys())}")
+            self.debug_path.write_text(resume_latex, encoding="utf-8")
+        return resume_latex
+
+
+_renderer: Optional[ResumeRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_resume_renderer() -> ResumeRenderer:
+    """Process-wide resume renderer"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ResumeRenderer()
+        return _renderer
+
+
+def render_latex(json_resume: Dict) -> Optional[str]:
+    """
+    Renders JSON resume data into LaTeX source
+
+    Args:
+        json_resume: Resume data in dictionary format
+
+    Returns:
+        LaTeX source if successful, None otherwise
+    """
+    try:
+        resume_latex = get_resume_renderer().render(json_resume)
+    except Exception as e:
+        logger.error(f"Error rendering LaTeX template: {e}")
         return None
 
-    # Render Latex Template
-    # print("Rendering LaTeX template...")
-    resume_latex = LatexProcessor.use_template(latex_jinja_env, escaped_json_resume)
     if not resume_latex:
         print("Failed to render LaTeX template")
         return None
 
-    # Save Latex
-    tex_temp_path = os.path.join(templates_path, os.path.basename(dst_path).replace(".pdf", ".tex"))
-    # print(f"Writing LaTeX to {tex_temp_path}")
+    return resume_latex
 
-    # Write file
-    try:
-        with open(tex_temp_path, 'w') as f:
-            f.write(resume_latex)
-    except Exception as e:
-        print(f"Error writing LaTeX file: {str(e)}")
+
+def _render_for_cache(json_resume: Dict, render_cache: Optional[RenderCache]) -> Tuple[Optional[str], Optional[str]]:
+    """Render LaTeX source and its render cache key (None without a cache)"""
+    renderer = get_resume_renderer()
+    escaped_json_resume = LatexProcessor.escape_for_latex(json_resume)
+    key = renderer.cache_key(escaped_json_resume) if render_cache is not None else None
+    return renderer.render_escaped(escaped_json_resume), key
+
+
+def _record_compile(timings: Optional[Dict[str, float]], result: Optional[CompileResult]) -> None:
+    """Report a compile's passes and seconds into `timings`; a render cache hit counts as zero passes"""
+    if timings is not None:
+        timings["latex_passes"] = result.passes if result else 0
+        timings["latex_compile"] = result.seconds if result else 0.0
+
+
+@timer_decoder
+@error_handler
+def latex_to_pdf(
+    json_resume: Dict,
+    dst_path: str,
+    render_cache: Optional[RenderCache] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> Optional[str]:
+    """
+    Converts JSON resume data to a PDF document via LaTeX
+    
+    Args:
+        json_resume: Resume data in dictionary format
+        dst_path: Destination path for the PDF file
+        render_cache: Optional store of compiled resumes; unchanged content is served from it
+        timings: Optional dict that receives the compile's "latex_passes" and "latex_compile" seconds
+        
+    Returns:
+        Path to the PDF if successful, None otherwise
+    """
+    resume_latex, key = _render_for_cache(json_resume, render_cache)
+    if not resume_latex:
+        print("Failed to render LaTeX template")
         return None
 
-    # Convert to PDF
-    # print(f"Converting LaTeX to PDF: {tex_temp_path} -> {dst_path}")
-    pdf_path = LatexProcessor.save_latex_as_pdf(tex_temp_path, dst_path)
+    if key and render_cache.fetch(key, dst_path):
+        logger.info(f"Resume PDF served from render cache: {dst_path}")
+        _record_compile(timings, None)
+        return dst_path
 
-    if pdf_path:
-        print(f"Successfully created PDF: {pdf_path}")
-        return pdf_path
+    # Convert to PDF in an isolated compile job
+    result = get_latex_compiler().compile(resume_latex, dst_path)
+    _record_compile(timings, result)
+
+    if result.pdf_path:
+        print(f"Successfully created PDF: {result.pdf_path} ({result.passes} pdflatex passes, {result.seconds:.2f}s)")
+        if key:
+            render_cache.store(key, result.pdf_path)
+        return result.pdf_path
     else:
         print("Failed to create PDF")
         return None
 
+
+@timer_decoder
+@error_handler
+async def alatex_to_pdf(
+    json_resume: Dict,
+    dst_path: str,
+    render_cache: Optional[RenderCache] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> Optional[str]:
+    """
+    Async version of latex_to_pdf: rendering runs in a worker thread and the compile job
+    on the compiler's pool, so the event loop is never blocked
+    """
+    resume_latex, key = await asyncio.to_thread(_render_for_cache, json_resume, render_cache)
+    if not resume_latex:
+        logger.error("Failed to render LaTeX template")
+        return None
+
+    if key and await asyncio.to_thread(render_cache.fetch, key, dst_path):
+        logger.info(f"Resume PDF served from render cache: {dst_path}")
+        _record_compile(timings, None)
+        return dst_path
+
+    result = await get_latex_compiler().acompile(resume_latex, dst_path)
+    _record_compile(timings, result)
+    if result.pdf_path:
+        logger.info(f"Successfully created PDF: {result.pdf_path} ({result.passes} pdflatex passes, {result.seconds:.2f}s)")
+        if key:
+            await asyncio.to_thread(render_cache.store, key, result.pdf_path)
+    else:
+        logger.error("Failed to create PDF")
+    return result.pdf_path
+
 # For backward compatibility
 escape_for_latex = LatexProcessor.escape_for_latex
 use_template = LatexProcessor.use_template
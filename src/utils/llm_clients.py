@@ -0,0 +1,120 @@
+'''
+---------------------------------
+File: llm_clients.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import atexit
+import asyncio
+import logging
+import threading
+import weakref
+
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from src.envs import LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_KEEPALIVE_EXPIRY
+
+
+logger = logging.getLogger(__name__)
+
+# Provider -> (sync client class, async client class); all are OpenAI-compatible for now
+PROVIDER_CLIENTS = {
+    "GPT": (OpenAI, AsyncOpenAI),
+}
+
+ClientKey = Tuple[str, Optional[str], Optional[str]]
+
+
+class ClientRegistry:
+    """
+    Process-wide LLM API clients keyed by (provider, api_key, base_url).
+
+    Every ChatGPT instance with the same key borrows the same client, so its HTTP
+    connection pool and TLS sessions survive across AdaptiveCV instances and requests.
+    Async clients are bound to the event loop they are used on (httpx pools cannot move
+    between loops), so they are kept per running loop and dropped with it.
+
+    Args:
+        limits (httpx.Limits, optional): Connection pool limits shared by each client.
+    """
+
+    def __init__(self, limits: Optional[httpx.Limits] = None):
+        self.limits = limits or httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        )
+        self._lock = threading.Lock()
+        self._clients: Dict[ClientKey, OpenAI] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+    def get(self, provider: str, api_key: Optional[str], base_url: Optional[str] = None) -> OpenAI:
+        """Shared synchronous client for the key, created on first use"""
+        key = (provider, api_key, base_url)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client_class = self._client_classes(provider)[0]
+                client = client_class(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=0,
+                    http_client=DefaultHttpxClient(limits=self.limits),
+                )
+                self._clients[key] = client
+                logger.debug(f"Created {provider} client for {base_url or 'default endpoint'}")
+            return client
+
+    def get_async(self, provider: str, api_key: Optional[str], base_url: Optional[str] = None) -> AsyncOpenAI:
+        """Shared async client for the key on the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        key = (provider, api_key, base_url)
+        with self._lock:
+            loop_clients = self._async_clients.setdefault(loop, {})
+            client = loop_clients.get(key)
+            if client is None:
+                client_class = self._client_classes(provider)[1]
+                client = client_class(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(limits=self.limits),
+                )
+                loop_clients[key] = client
+            return client
+
+    def close(self) -> None:
+        """Close pooled synchronous connections (async pools close with their loop)"""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing LLM client: {e}")
+
+    @staticmethod
+    def _client_classes(provider: str) -> Tuple[type, type]:
+        if provider not in PROVIDER_CLIENTS:
+            raise ValueError(f"Invalid LLM Provider: {provider}. Supported providers: {', '.join(PROVIDER_CLIENTS)}")
+        return PROVIDER_CLIENTS[provider]
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Process-wide client registry, closed at interpreter exit"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+            atexit.register(_registry.close)
+        return _registry
@@ -7,27 +7,82 @@ Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
 ---------------------------------
 '''
 import json
+import asyncio
 import logging
 
-from typing import Dict, List, Optional, Union, Any
+from typing import Callable, Dict, List, Optional, Union, Any
+from concurrent.futures import ThreadPoolExecutor
 
-import pandas as pd
+import numpy as np
 import streamlit as st
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 from src.utils.utils import parse_json_markdown
-from src.envs import GPT_EMBEDDING_MODEL
+from src.utils.cache import DiskCache, make_cache_key
+from src.utils.cassette import Cassette, encode_matrix, decode_matrix
+from src.utils.llm_clients import get_client_registry
+from src.utils.llm_scheduler import RequestScheduler, get_scheduler
+from src.envs import (
+    GPT_EMBEDDING_MODEL, EMBEDDING_BATCH_TOKENS, EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_WORKERS,
+    LLM_DEFAULT_COMPLETION_TOKENS
+)
 
 
 logger = logging.getLogger(__name__)
 
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for batching decisions (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def batch_by_tokens(texts: List[str], max_tokens: int = EMBEDDING_BATCH_TOKENS, max_items: int = EMBEDDING_BATCH_SIZE) -> List[List[int]]:
+    """
+    Group text indices into consecutive batches bounded by estimated tokens and item count.
+
+    Args:
+        texts (List[str]): Texts to batch.
+        max_tokens (int): Token budget per batch. A single longer text gets a batch of its own.
+        max_items (int): Maximum number of texts per batch.
+
+    Returns:
+        List[List[int]]: Batches of indices into `texts`, in input order.
+    """
+    batches, current, current_tokens = [], [], 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
 class ChatGPT:
     """
     A wrapper class for OpenAI's GPT models with simplified interface for 
     generating responses and embeddings.
+
+    The underlying OpenAI client is borrowed from the process-wide client registry, so
+    instances with the same api_key and base_url share one connection pool. Requests go
+    through a per-model RequestScheduler that enforces RPM/TPM limits and retries 429s
+    and transient errors with backoff. With a cassette, get_response and get_embedding
+    record to or replay from a fixture instead of depending on the network.
     """
-    def __init__(self, api_key: str, model: str, system_prompt: str):
+    provider = "GPT"
+
+    def __init__(self,
+                 api_key: str,
+                 model: str,
+                 system_prompt: str,
+                 cache: Optional[DiskCache] = None,
+                 base_url: Optional[str] = None,
+                 cassette: Optional[Cassette] = None):
         """
         Initialize the ChatGPT client.
         
@@ -35,16 +90,37 @@ class ChatGPT:
             api_key (str): OpenAI API key
             model (str): Model identifier (e.g., "gpt-4", "gpt-3.5-turbo")
             system_prompt (str): System prompt/instruction to guide model behavior
+            cache (DiskCache, optional): Response cache shared across calls, None disables caching
+            base_url (str, optional): OpenAI-compatible endpoint, None for the default API
+            cassette (Cassette, optional): Record/replay fixture for responses and embeddings
         """
         self.model = model
         self.system_prompt = {"role": "system", "content": system_prompt.strip()} if system_prompt.strip() else None
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache = cache
+        self.cassette = cassette
+
+    @property
+    def client(self) -> OpenAI:
+        return get_client_registry().get(self.provider, self.api_key, self.base_url)
+
+    def scheduler(self, model: Optional[str] = None) -> RequestScheduler:
+        """Shared scheduler for a model (the chat model by default)"""
+        return get_scheduler(self.provider, self.api_key, self.base_url, model or self.model)
+
+    @staticmethod
+    def _request_tokens(request: Dict[str, Any]) -> int:
+        """Estimated prompt plus completion tokens of a chat request"""
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in request["messages"])
+        return prompt_tokens + (request["max_tokens"] or LLM_DEFAULT_COMPLETION_TOKENS)
 
     def get_response(self,
                      prompt: str,
                      expecting_longer_output: bool = False,
                      need_json_output: bool = False,
-                     temperature: float = 0) -> Union[str, Dict[str, Any]]:
+                     temperature: float = 0,
+                     use_cache: bool = True) -> Union[str, Dict[str, Any]]:
         """
         Get a response from the GPT model.
         
@@ -53,71 +129,277 @@ class ChatGPT:
             expecting_longer_output (bool): Whether to allocate more tokens for longer responses
             need_json_output (bool): Whether to request and parse JSON output
             temperature (float): Sampling temperature (0-1), lower is more deterministic
+            use_cache (bool): Whether to read from and write to the response cache for this call
             
         Returns:
             Union[str, Dict[str, Any]]: Plain text response or parsed JSON object
+
+        Raises:
+            CassetteMissError: When replaying a cassette that has no recording for the request.
         """
+        request = self._build_request(prompt, expecting_longer_output, need_json_output, temperature)
+        if self.cassette is not None:
+            return self.cassette.play("chat", request, lambda: self._live_response(prompt, request, need_json_output, use_cache))
+        return self._live_response(prompt, request, need_json_output, use_cache)
+
+    def _live_response(self, prompt: str, request: Dict[str, Any], need_json_output: bool, use_cache: bool) -> Union[str, Dict[str, Any]]:
+        """Serve a chat request from the response cache or the API"""
+        cache_key = self._cache_key(prompt, request) if use_cache else None
+        if cache_key:
+            cached_content = self.cache.get(cache_key)
+            if cached_content is not None:
+                logger.debug(f"LLM response cache hit: {cache_key[:12]}")
+                return self._parse_content(cached_content, need_json_output)
+
+        try:
+            completion = self.scheduler().call(
+                self.client.chat.completions.with_raw_response.create, request, self._request_tokens(request)
+            )
+            return self._handle_completion(completion, need_json_output, cache_key)
+        except Exception as e:
+            return self._handle_error(e, need_json_output)
+
+    def _build_request(self, prompt: str, expecting_longer_output: bool, need_json_output: bool, temperature: float) -> Dict[str, Any]:
+        """Keyword arguments for chat.completions.create"""
         messages = []
         if self.system_prompt:
             messages.append(self.system_prompt)
         messages.append({"role": "user", "content": prompt})
 
-        response_format = {"type": "json_object"} if need_json_output else None
-        max_tokens = 4000 if expecting_longer_output else None
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": 4000 if expecting_longer_output else None,
+            "response_format": {"type": "json_object"} if need_json_output else None,
+        }
 
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                response_format=response_format
-            )
+    def _cache_key(self, prompt: str, request: Dict[str, Any]) -> Optional[str]:
+        """Response cache key, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        # The endpoint is part of the key so responses from a local/fake server never serve real runs
+        return make_cache_key(
+            self.base_url,
+            self.model,
+            self.system_prompt["content"] if self.system_prompt else None,
+            prompt,
+            request["temperature"],
+            request["response_format"],
+            request["max_tokens"],
+        )
 
-            content = completion.choices[0].message.content.strip()
+    def _handle_completion(self, completion: Any, need_json_output: bool, cache_key: Optional[str]) -> Union[str, Dict[str, Any]]:
+        """Parse a completion and cache it if it parsed into something usable"""
+        content = completion.choices[0].message.content.strip()
+        result = self._parse_content(content, need_json_output)
 
-            if need_json_output:
-                return parse_json_markdown(content) or {}
-            return content
-        
-        except Exception as e:
-            logger.error(f"Error in OpenAI API: {e}")
-            st.error(f"Error in OpenAI API: {str(e)}")
-            st.markdown("<h3 style='text-align: center;'>Please try again! Check the log in the dropdown for more details.</h3>", unsafe_allow_html=True)
-            return {} if need_json_output else ""
-        
+        if cache_key and result:
+            self.cache.set(cache_key, content)
+
+        return result
+
+    @staticmethod
+    def _handle_error(error: Exception, need_json_output: bool) -> Union[str, Dict[str, Any]]:
+        logger.error(f"Error in OpenAI API: {error}")
+        st.error(f"Error in OpenAI API: {str(error)}")
+        st.markdown("<h3 style='text-align: center;'>Please try again! Check the log in the dropdown for more details.</h3>", unsafe_allow_html=True)
+        return {} if need_json_output else ""
     
+    @staticmethod
+    def _parse_content(content: str, need_json_output: bool) -> Union[str, Dict[str, Any]]:
+        """Convert raw completion text into the caller's expected output type"""
+        if need_json_output:
+            return parse_json_markdown(content) or {}
+        return content
+
     def get_embedding(self,
                       text: Union[str, List[str]],
                       model: str = GPT_EMBEDDING_MODEL,
-                      task_type: str = 'retrieval_document') -> Union[List[float], pd.DataFrame]:
+                      task_type: str = 'retrieval_document',
+                      max_workers: int = EMBEDDING_MAX_WORKERS) -> Union[List[float], np.ndarray]:
         """
         Generate embeddings for text using OpenAI's embedding models.
+
+        Lists are sent in token-bounded batches, with batches requested concurrently.
         
         Args:
             text (Union[str, List[str]]): Single text string or list of text chunks
             model (str): Embedding model to use
             task_type (str): Task type for embedding (only used for compatibility with other LLM classes)
+            max_workers (int): Maximum number of batch requests in flight
             
         Returns:
-            Union[List[float], pd.DataFrame]: Raw embedding vector or DataFrame with embeddings
+            Union[List[float], np.ndarray]: Raw embedding vector, or a contiguous float32 matrix
+            with one row per input chunk (in input order)
+
+        Raises:
+            CassetteMissError: When replaying a cassette that has no recording for the request.
         """
+        if self.cassette is not None:
+            return self.cassette.play(
+                "embedding", [model, text], lambda: self._live_embedding(text, model, max_workers),
+                **self._embedding_codec(text),
+            )
+        return self._live_embedding(text, model, max_workers)
+
+    @staticmethod
+    def _embedding_codec(text: Union[str, List[str]]) -> Dict[str, Callable]:
+        """Cassette encode/decode for embedding results (matrices are stored as base64 float32)"""
+        if isinstance(text, list):
+            return {"encode": encode_matrix, "decode": decode_matrix, "record_if": lambda result: result.size > 0}
+        return {"record_if": lambda result: len(result) > 0}
+
+    def _live_embedding(self, text: Union[str, List[str]], model: str, max_workers: int) -> Union[List[float], np.ndarray]:
         try:
             if isinstance(text, list):
-                df = pd.DataFrame(text, columns=['chunk'])
+                return self._get_embedding_matrix(text, model, max_workers)
 
-                df['chunk'] = df['chunk'].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else str(x))
-                df['embedding'] = df['chunk'].apply(
-                    lambda x: self.client.embeddings.create(input=[x], model=model).data[0].embedding
-                )
-                
-                return df
-            else:
-                cleaned_text = text.replace("\n", " ") if isinstance(text, str) else str(text)
-                return self.client.embeddings.create(input=[cleaned_text], model=model).data[0].embedding
+            cleaned_text = text.replace("\n", " ") if isinstance(text, str) else str(text)
+            response = self.scheduler(model).call(
+                self.client.embeddings.with_raw_response.create,
+                {"input": [cleaned_text], "model": model},
+                estimate_tokens(cleaned_text),
+            )
+            return response.data[0].embedding
         except Exception as e:
             logger.error(f"Error in getting embeddings: {e}")
             if isinstance(text, list):
-                return pd.DataFrame(columns=['chunk', 'embedding'])
+                return np.empty((0, 0), dtype=np.float32)
             return []
 
+    def _get_embedding_matrix(self, texts: List[Any], model: str, max_workers: int) -> np.ndarray:
+        """Embed a list of chunks with batched, concurrent requests"""
+        chunks = self._clean_chunks(texts)
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batches = batch_by_tokens(chunks)
+
+        def embed_batch(indices: List[int]) -> List[List[float]]:
+            batch = [chunks[i] for i in indices]
+            response = self.scheduler(model).call(
+                self.client.embeddings.with_raw_response.create,
+                {"input": batch, "model": model},
+                sum(estimate_tokens(chunk) for chunk in batch),
+            )
+            return self._ordered_embeddings(response)
+
+        if len(batches) == 1 or max_workers <= 1:
+            results = [embed_batch(indices) for indices in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                results = list(executor.map(embed_batch, batches))
+
+        logger.debug(f"Embedded {len(chunks)} chunks in {len(batches)} requests")
+        return self._stack_batches(results)
+
+    @staticmethod
+    def _clean_chunks(texts: List[Any]) -> List[str]:
+        return [x.replace("\n", " ") if isinstance(x, str) else str(x) for x in texts]
+
+    @staticmethod
+    def _ordered_embeddings(response: Any) -> List[List[float]]:
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    @staticmethod
+    def _stack_batches(results: List[List[List[float]]]) -> np.ndarray:
+        # Batches are consecutive index ranges, so concatenating keeps the input order
+        return np.ascontiguousarray([vector for batch in results for vector in batch], dtype=np.float32)
+
+
+class AsyncChatGPT(ChatGPT):
+    """
+    Asyncio counterpart of ChatGPT built on AsyncOpenAI.
+
+    Shares request building, response caching and parsing with ChatGPT; get_response and
+    get_embedding are coroutines, so one event loop can drive many requests without a
+    thread per call.
+    """
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Async clients are pooled per event loop, so resolve on every use
+        return get_client_registry().get_async(self.provider, self.api_key, self.base_url)
+
+    async def get_response(self,
+                           prompt: str,
+                           expecting_longer_output: bool = False,
+                           need_json_output: bool = False,
+                           temperature: float = 0,
+                           use_cache: bool = True) -> Union[str, Dict[str, Any]]:
+        """Async version of ChatGPT.get_response"""
+        request = self._build_request(prompt, expecting_longer_output, need_json_output, temperature)
+        if self.cassette is not None:
+            return await self.cassette.aplay("chat", request, lambda: self._live_response(prompt, request, need_json_output, use_cache))
+        return await self._live_response(prompt, request, need_json_output, use_cache)
+
+    async def _live_response(self, prompt: str, request: Dict[str, Any], need_json_output: bool, use_cache: bool) -> Union[str, Dict[str, Any]]:
+        cache_key = self._cache_key(prompt, request) if use_cache else None
+        if cache_key:
+            cached_content = self.cache.get(cache_key)
+            if cached_content is not None:
+                logger.debug(f"LLM response cache hit: {cache_key[:12]}")
+                return self._parse_content(cached_content, need_json_output)
+
+        try:
+            completion = await self.scheduler().acall(
+                self.client.chat.completions.with_raw_response.create, request, self._request_tokens(request)
+            )
+            return self._handle_completion(completion, need_json_output, cache_key)
+        except Exception as e:
+            return self._handle_error(e, need_json_output)
+
+    async def get_embedding(self,
+                            text: Union[str, List[str]],
+                            model: str = GPT_EMBEDDING_MODEL,
+                            task_type: str = 'retrieval_document',
+                            max_workers: int = EMBEDDING_MAX_WORKERS) -> Union[List[float], np.ndarray]:
+        """Async version of ChatGPT.get_embedding; max_workers bounds the batch requests in flight"""
+        if self.cassette is not None:
+            return await self.cassette.aplay(
+                "embedding", [model, text], lambda: self._live_embedding(text, model, max_workers),
+                **self._embedding_codec(text),
+            )
+        return await self._live_embedding(text, model, max_workers)
+
+    async def _live_embedding(self, text: Union[str, List[str]], model: str, max_workers: int) -> Union[List[float], np.ndarray]:
+        try:
+            if isinstance(text, list):
+                return await self._get_embedding_matrix(text, model, max_workers)
+
+            cleaned_text = text.replace("\n", " ") if isinstance(text, str) else str(text)
+            response = await self.scheduler(model).acall(
+                self.client.embeddings.with_raw_response.create,
+                {"input": [cleaned_text], "model": model},
+                estimate_tokens(cleaned_text),
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.error(f"Error in getting embeddings: {e}")
+            if isinstance(text, list):
+                return np.empty((0, 0), dtype=np.float32)
+            return []
+
+    async def _get_embedding_matrix(self, texts: List[Any], model: str, max_workers: int) -> np.ndarray:
+        chunks = self._clean_chunks(texts)
+        if not chunks:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batches = batch_by_tokens(chunks)
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def embed_batch(indices: List[int]) -> List[List[float]]:
+            batch = [chunks[i] for i in indices]
+            async with semaphore:
+                response = await self.scheduler(model).acall(
+                    self.client.embeddings.with_raw_response.create,
+                    {"input": batch, "model": model},
+                    sum(estimate_tokens(chunk) for chunk in batch),
+                )
+            return self._ordered_embeddings(response)
+
+        results = await asyncio.gather(*(embed_batch(indices) for indices in batches))
+
+        logger.debug(f"Embedded {len(chunks)} chunks in {len(batches)} requests")
+        return self._stack_batches(list(results))
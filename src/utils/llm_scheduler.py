@@ -0,0 +1,201 @@
+'''
+---------------------------------
+File: llm_scheduler.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+import openai
+
+from src.utils.rate_limit import TokenBucket
+from src.envs import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+)
+
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate-limit reset durations such as "20ms", "1s" or "6m0s" into seconds"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds the server asked us to wait, from retry-after-ms or retry-after"""
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                continue
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection failures and 5xx responses are worth retrying"""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+class RequestScheduler:
+    """
+    Admits LLM requests through requests-per-minute and tokens-per-minute token buckets.
+
+    Callers pass the estimated tokens for a request; the scheduler waits until both
+    buckets can cover it (requests queue in arrival order rather than being dropped),
+    sends it, and retries retryable failures with full-jitter exponential backoff,
+    honoring Retry-After. x-ratelimit-* response headers resize the buckets to the
+    server's actual limits and pull the balances down to what the server says remains.
+
+    Args:
+        rpm (int): Starting requests-per-minute limit.
+        tpm (int): Starting tokens-per-minute limit.
+        max_retries (int): Retries after the first attempt.
+        backoff_base (float): Backoff for the first retry, in seconds.
+        backoff_max (float): Backoff ceiling, in seconds.
+    """
+
+    def __init__(self,
+                 rpm: int = LLM_REQUESTS_PER_MINUTE,
+                 tpm: int = LLM_TOKENS_PER_MINUTE,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX):
+        self.requests = TokenBucket(rpm / 60.0, capacity=rpm)
+        self.tokens = TokenBucket(tpm / 60.0, capacity=tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+
+    def call(self, send: Callable[..., Any], request: Dict[str, Any], estimated_tokens: int) -> Any:
+        """
+        Send a request through `send` (a with_raw_response method) and return the parsed result.
+
+        Raises:
+            openai.OpenAIError: The last error once retries are exhausted or it is not retryable.
+        """
+        for attempt in range(self.max_retries + 1):
+            wait, reserved = self._admit(estimated_tokens)
+            time.sleep(wait)
+            try:
+                raw = send(**request)
+            except Exception as e:
+                self._release(e, reserved)
+                time.sleep(self._retry_delay(e, attempt))
+                continue
+            return self._complete(raw, estimated_tokens)
+
+    async def acall(self, send: Callable[..., Awaitable[Any]], request: Dict[str, Any], estimated_tokens: int) -> Any:
+        """Async version of call"""
+        for attempt in range(self.max_retries + 1):
+            wait, reserved = self._admit(estimated_tokens)
+            await asyncio.sleep(wait)
+            try:
+                raw = await send(**request)
+            except Exception as e:
+                self._release(e, reserved)
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            return self._complete(raw, estimated_tokens)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def observe(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Adapt the buckets to x-ratelimit-* headers from a response"""
+        if not headers:
+            return
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            if limit and limit.isdigit() and int(limit) > 0:
+                bucket.configure(rate=int(limit) / 60.0, capacity=int(limit))
+
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining and remaining.isdigit():
+                bucket.limit_to(int(remaining))
+
+    def _admit(self, estimated_tokens: int) -> Tuple[float, float]:
+        """Reserve one request and the estimated tokens; returns (wait before sending, tokens reserved)"""
+        tokens = min(estimated_tokens, self.tokens.capacity)
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            self.stats["throttled_seconds"] += wait
+            logger.debug(f"Throttling LLM request for {wait:.2f}s")
+        return wait, tokens
+
+    def _release(self, error: Exception, tokens: float) -> None:
+        """Give back the reservation of a rate-limited attempt, which the server did not count"""
+        if isinstance(error, openai.APIStatusError) and error.status_code == 429:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Delay before the next attempt, or re-raise when the error is final"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            raise error
+
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        self.observe(headers)
+
+        delay = max(self.backoff(attempt), retry_after(headers) or 0.0)
+        self.stats["retries"] += 1
+        logger.warning(f"LLM request failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+    def _complete(self, raw: Any, estimated_tokens: int) -> Any:
+        """Record headers and actual usage of a successful raw response and parse it"""
+        self.stats["requests"] += 1
+        self.observe(raw.headers)
+        result = raw.parse()
+
+        usage = getattr(result, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if total_tokens is not None and total_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - total_tokens)
+        return result
+
+
+_schedulers: Dict[Tuple[str, Optional[str], Optional[str], str], RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider: str, api_key: Optional[str], base_url: Optional[str], model: str) -> RequestScheduler:
+    """Process-wide scheduler per (provider, api_key, base_url, model); limits apply per model"""
+    key = (provider, api_key, base_url, model)
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = RequestScheduler()
+        return _schedulers[key]
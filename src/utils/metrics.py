@@ -9,9 +9,8 @@ Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
 import re
 import json
 import numpy as np
-import pandas as pd
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterable
 from functools import lru_cache
 
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -24,6 +23,8 @@ from nltk.stem import PorterStemmer
 from nltk.tokenize import word_tokenize
 
 from src.utils.utils import key_value_chunking
+from src.utils.embedding_store import EmbeddingStore, get_embedding_store
+from src.utils.tfidf import TfidfScorer, get_default_scorer
 
 # Downloading nltk resources
 try:
@@ -44,12 +45,85 @@ STEMMER = PorterStemmer()
 URL_PATTERN = re.compile(r"https?://\S+")
 NON_ALPHA_PATTERN = re.compile('[^a-zA-Z]')
 
+# Regex tokenizer reproducing word_tokenize's token boundaries: contractions are
+# split off (clitics, plus NLTK's CONTRACTIONS2/3 such as "cannot", "wanna" and
+# "'tis"), and the text is cut on whitespace, quotes, brackets, ;@#$%&?!* and on
+# colons/commas unless followed by a digit, runs of two or more dots and "--"
+TOKEN_SEPARATORS = r"\s\"“”‘’«»„`;@#$%&?!()\[\]{}<>*"
+# Positions where word_tokenize has padded the text with a space
+TOKEN_BREAK = rf"[{TOKEN_SEPARATORS}]|[:,](?!\d)|\.\.|--|'(?:\s|$)|\.?['\"\]\)}}>»”’]*\s*$"
+
+CONTRACTION_PATTERN = re.compile(r"(?i)(?<=[^' ])(n't|'s|'m|'d|'ll|'re|'ve)(?=[^a-zA-Z]|$)")
+MULTIWORD_CONTRACTION_PATTERN = re.compile(
+    r"(?i)\b(can)(not)\b|\b(d)('ye)\b|\b(gim)(me)\b|\b(gon)(na)\b|\b(got)(ta)\b|\b(lem)(me)\b|\b(more)('n)\b"
+    rf"|\b(wan)(na)(?={TOKEN_BREAK})"
+    rf"|(?:^|(?<=[{TOKEN_SEPARATORS}:,])|(?<=\.\.)|(?<=--))('t)(is|was)\b"
+)
+TOKEN_SPLIT_PATTERN = re.compile(rf"[{TOKEN_SEPARATORS}]+|[:,](?!\d)|\.{{2,}}|--")
+
+# Process-wide word -> stem memo, bounded so arbitrary input cannot grow it forever
+STEM_MEMO: Dict[str, str] = {}
+STEM_MEMO_MAX_SIZE = 100_000
+
 
 def remove_urls(list_of_strings: List[str]) -> List[str]:
     """Remove strings containing URLs using re"""
     return [string for string in list_of_strings if not URL_PATTERN.search(string)]
 
 
+# Metric name -> (first document, second document) compared for it
+METRIC_PAIRS: Dict[str, Tuple[str, str]] = {
+    "user_personalization": ("resume", "user"),
+    "job_alignment": ("resume", "job"),
+    "job_match": ("user", "job"),
+}
+TEXT_METRICS = ["jaccard_similarity", "overlap_coefficient", "cosine_similarity"]
+
+
+def stem_word(word: str) -> str:
+    """Porter-stem a word, memoized across the process lifetime"""
+    stem = STEM_MEMO.get(word)
+    if stem is None:
+        stem = STEMMER.stem(word)
+        if len(STEM_MEMO) < STEM_MEMO_MAX_SIZE:
+            STEM_MEMO[word] = stem
+    return stem
+
+
+def split_contraction(match: re.Match) -> str:
+    """Separate the two halves of a MULTIWORD_CONTRACTION_PATTERN match"""
+    return " " + " ".join(part for part in match.groups() if part) + " "
+
+
+def tokenize_and_stem(text: str) -> List[str]:
+    """Tokenize, clean and stem text without caching (see normalize_text)
+
+    Fast path equivalent to tokenize_and_stem_nltk: a precompiled regex split
+    followed by alphabetic cleaning, stopword filtering and memoized stemming.
+    """
+    text = CONTRACTION_PATTERN.sub(r" \1", text)
+    text = MULTIWORD_CONTRACTION_PATTERN.sub(split_contraction, text)
+
+    return [
+        stem_word(word)
+        for word in (NON_ALPHA_PATTERN.sub('', token).lower() for token in TOKEN_SPLIT_PATTERN.split(text))
+        if word and word not in STOP_WORDS
+    ]
+
+
+def tokenize_and_stem_nltk(text: str) -> List[str]:
+    """Reference implementation of tokenize_and_stem using NLTK's word_tokenize"""
+    words = word_tokenize(text)
+
+    words = [
+        STEMMER.stem(word)
+        for word in (NON_ALPHA_PATTERN.sub('', word).lower() for word in words)
+        if word and word not in STOP_WORDS
+    ]
+
+    return words
+
+
 @lru_cache(maxsize=128)
 def normalize_text(text: str) -> List[str]:
     """Normalize the input text (tokenization, cleaning, stemming)
@@ -62,16 +136,7 @@ def normalize_text(text: str) -> List[str]:
     Returns:
         List[str]: The list of normalized words.
     """
-
-    words = word_tokenize(text)
-
-    words = [
-        STEMMER.stem(word)
-        for word in (NON_ALPHA_PATTERN.sub('', word).lower() for word in words)
-        if word and word not in STOP_WORDS
-    ]
-
-    return words
+    return tokenize_and_stem(text)
 
 
 def _get_word_sets(document1: str, document2: str) -> tuple[Set[str], Set[str]]:
@@ -130,16 +195,24 @@ def jaccard_similarity(document1: str, document2: str) -> float:
     return intersection_size / union_size
 
 
-def cosine_similarity(document1: str, document2: str) -> float:
+def cosine_similarity(document1: str, document2: str, scorer: Optional[TfidfScorer] = None) -> float:
     """Calculate the cosine similarity between two documents using TF-IDF vectors.
+
+    Uses the TF-IDF model fitted on the reference corpus when available, so scores are
+    comparable across jobs; otherwise the vectorizer is fitted on the two documents.
     
     Args:
         document1 (str): The first document.
         document2 (str): The second document.
+        scorer (TfidfScorer, optional): Fitted TF-IDF model. Defaults to the reference corpus model.
         
     Returns:
         float: The cosine similarity score between the documents.
     """
+    if scorer is None:
+        scorer = get_default_scorer()
+    if scorer is not None:
+        return scorer.similarity(document1, document2)
 
     vectorizer = TfidfVectorizer()
     vectors = vectorizer.fit_transform([document1, document2])
@@ -148,27 +221,146 @@ def cosine_similarity(document1: str, document2: str) -> float:
     return similarity
 
 
-def vector_embedding_similarity(llm, document1: str, document2: str) -> float:
+def vector_embedding_similarity(llm, document1: str, document2: str, store: Optional[EmbeddingStore] = None) -> float:
     """Calculate similarity between documents using vector embeddings.
+
+    Chunk embeddings are read from (and added to) a persistent embedding store,
+    so chunks seen before cost no API calls.
     
     Args:
         llm: The language model to use for embeddings.
         document1 (str): The first document (JSON string).
         document2 (str): The second document (JSON string).
+        store (EmbeddingStore, optional): Embedding store. Defaults to the shared store for the llm's endpoint.
         
     Returns:
         float: The average cosine similarity between document embeddings.
     """
+    if store is None:
+        store = get_embedding_store(base_url=getattr(llm, "base_url", None))
+    embed_fn = lambda chunks: llm.get_embedding(chunks, task_type="retrieval_query")
 
-    doc1_chunks = key_value_chunking(json.loads(document1))
-    doc2_chunks = key_value_chunking(json.loads(document2))
+    emb_1 = store.get_or_compute(key_value_chunking(json.loads(document1)), embed_fn)
+    emb_2 = store.get_or_compute(key_value_chunking(json.loads(document2)), embed_fn)
 
-    emb_1 = llm.get_embedding(doc1_chunks, task_type="retrieval_query")
-    emb_2 = llm.get_embedding(doc2_chunks, task_type="retrieval_query")
+    if not emb_1.size or not emb_2.size:
+        return 0.0
+
+    # Cosine similarity of all chunk pairs as one normalized matrix product
+    emb_1 = emb_1 / np.maximum(np.linalg.norm(emb_1, axis=1, keepdims=True), 1e-12)
+    emb_2 = emb_2 / np.maximum(np.linalg.norm(emb_2, axis=1, keepdims=True), 1e-12)
+    similarity_matrix = emb_1 @ emb_2.T
+
+    return float(similarity_matrix.mean())
+
+
+class MetricsEngine:
+    """Single-pass computation of all similarity metrics between a set of documents.
+
+    Each document is serialized, tokenized and stemmed exactly once; word sets, TF-IDF
+    vectors and (optionally) chunk embeddings are built once and shared by every
+    metric/pair combination.
 
-    df1 = pd.DataFrame(emb_1.embedding.to_list())
-    df2 = pd.DataFrame(emb_2.embedding.to_list())
+    Args:
+        documents (Dict[str, Any]): Documents by name, dicts/lists are serialized to JSON.
+        llm: Language model for embeddings, required only for vector_embedding_similarity.
+        store (EmbeddingStore, optional): Embedding store. Defaults to the shared store for the llm's endpoint.
+        scorer (TfidfScorer, optional): Fitted TF-IDF model. Defaults to the reference corpus model.
+    """
+
+    def __init__(self, documents: Dict[str, Any], llm=None, store: Optional[EmbeddingStore] = None, scorer: Optional[TfidfScorer] = None):
+        self.documents = documents
+        self.texts = {
+            name: document if isinstance(document, str) else json.dumps(document)
+            for name, document in documents.items()
+        }
+        self.word_sets = {name: set(tokenize_and_stem(text)) for name, text in self.texts.items()}
+        self.llm = llm
+        self.store = store
+        self.scorer = scorer
+
+        self._tfidf_rows: Optional[Dict[str, Any]] = None
+        self._embeddings: Optional[Dict[str, np.ndarray]] = None
+
+    def jaccard_similarity(self, name1: str, name2: str) -> float:
+        """Jaccard similarity between two documents' word sets"""
+        words1, words2 = self.word_sets[name1], self.word_sets[name2]
+        union_size = len(words1 | words2)
+        return len(words1 & words2) / union_size if union_size else 0.0
+
+    def overlap_coefficient(self, name1: str, name2: str) -> float:
+        """Overlap coefficient between two documents' word sets"""
+        words1, words2 = self.word_sets[name1], self.word_sets[name2]
+        min_size = min(len(words1), len(words2))
+        return len(words1 & words2) / min_size if min_size else 0.0
+
+    def cosine_similarity(self, name1: str, name2: str) -> float:
+        """Cosine similarity between TF-IDF vectors computed once per document"""
+        if self._tfidf_rows is None:
+            names = list(self.texts)
+            texts = [self.texts[name] for name in names]
+            scorer = self.scorer if self.scorer is not None else get_default_scorer()
+            # Without a reference corpus, fit on the compared documents themselves
+            vectors = scorer.transform(texts) if scorer is not None else TfidfVectorizer().fit_transform(texts)
+            self._tfidf_rows = {name: vectors[i] for i, name in enumerate(names)}
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        return float(self._tfidf_rows[name1].multiply(self._tfidf_rows[name2]).sum())
+
+    def vector_embedding_similarity(self, name1: str, name2: str) -> float:
+        """Mean cosine similarity between the documents' chunk embeddings"""
+        if self._embeddings is None:
+            if self.llm is None:
+                raise ValueError("An llm is required for vector_embedding_similarity")
+            store = self.store if self.store is not None else get_embedding_store(base_url=getattr(self.llm, "base_url", None))
+            embed_fn = lambda chunks: self.llm.get_embedding(chunks, task_type="retrieval_query")
+
+            self._embeddings = {}
+            for name, document in self.documents.items():
+                data = json.loads(document) if isinstance(document, str) else document
+                embeddings = store.get_or_compute(key_value_chunking(data), embed_fn)
+                norms = np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12) if embeddings.size else 1.0
+                self._embeddings[name] = embeddings / norms
+
+        emb_1, emb_2 = self._embeddings[name1], self._embeddings[name2]
+        if not emb_1.size or not emb_2.size:
+            return 0.0
+        return float((emb_1 @ emb_2.T).mean())
+
+    def compute(self, metrics: Iterable[str] = TEXT_METRICS, pairs: Dict[str, Tuple[str, str]] = METRIC_PAIRS) -> Dict[str, Dict[str, float]]:
+        """Compute every requested metric for every document pair
+
+        Args:
+            metrics (Iterable[str]): Metric names, methods of this class.
+            pairs (Dict[str, Tuple[str, str]]): Output key -> pair of document names.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Scores as {metric: {pair_name: score}}.
+        """
+        return {
+            metric: {
+                pair_name: float(getattr(self, metric)(name1, name2))
+                for pair_name, (name1, name2) in pairs.items()
+            }
+            for metric in metrics
+        }
+
+
+def calculate_all_metrics(resume_details: Dict,
+                          user_data: Dict,
+                          job_details: Dict,
+                          metrics: Iterable[str] = TEXT_METRICS,
+                          llm=None) -> Dict[str, Dict[str, float]]:
+    """Score a generated resume against the user data and job details.
 
-    similarity_matrix = pairwise.cosine_similarity(df1, df2)
-    return similarity_matrix.mean()
+    Args:
+        resume_details (Dict): Generated resume details.
+        user_data (Dict): Original user data.
+        job_details (Dict): Job description details.
+        metrics (Iterable[str]): Metric names to compute.
+        llm: Language model, needed when vector_embedding_similarity is requested.
 
+    Returns:
+        Dict[str, Dict[str, float]]: {metric: {"user_personalization", "job_alignment", "job_match"}}.
+    """
+    engine = MetricsEngine({"resume": resume_details, "user": user_data, "job": job_details}, llm=llm)
+    return engine.compute(metrics)
@@ -0,0 +1,130 @@
+'''
+---------------------------------
+File: pipeline.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import time
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+logger = logging.getLogger(__name__)
+
+# Stage name -> (function receiving the results of finished stages, dependency names)
+StageMap = Dict[str, Tuple[Callable[[Dict[str, Any]], Any], List[str]]]
+AsyncStageMap = Dict[str, Tuple[Callable[[Dict[str, Any]], Awaitable[Any]], List[str]]]
+
+
+def _check_dependencies(stages: Dict[str, Tuple[Any, List[str]]]) -> None:
+    for name, (_, deps) in stages.items():
+        missing = [dep for dep in deps if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {', '.join(missing)}")
+
+
+def run_stages(stages: StageMap, max_workers: int = 4) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run a dependency graph of stages, starting each one as soon as its dependencies finish.
+
+    Independent stages run in parallel on a thread pool, so the total time approaches
+    the critical path of the graph. The first failing stage cancels everything that has
+    not started yet and its exception is re-raised.
+
+    Args:
+        stages (StageMap): Stage name -> (function, dependency names). Each function is
+            called with a dict of the results of all finished stages.
+        max_workers (int, optional): Maximum number of stages running at once. Defaults to 4.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, float]]: Stage results and per-stage wall time in seconds.
+    """
+    _check_dependencies(stages)
+
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    pending = dict(stages)
+    running = {}
+
+    def timed(name: str, func: Callable[[Dict[str, Any]], Any], inputs: Dict[str, Any]) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return func(inputs)
+        finally:
+            timings[name] = time.perf_counter() - start_time
+            logger.info(f"Stage {name} finished in {timings[name]:.2f}s")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+            for name in ready:
+                func, _ = pending.pop(name)
+                running[executor.submit(timed, name, func, dict(results))] = name
+
+            if not running:
+                raise ValueError(f"Stages with unresolvable dependencies: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+
+    return results, timings
+
+
+async def arun_stages(stages: AsyncStageMap) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Asyncio version of run_stages: each stage is a coroutine function started as a task
+    once its dependencies finish. The first failing stage cancels the stages still running
+    and its exception is re-raised.
+
+    Args:
+        stages (AsyncStageMap): Stage name -> (coroutine function, dependency names).
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, float]]: Stage results and per-stage wall time in seconds.
+    """
+    _check_dependencies(stages)
+
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    pending = dict(stages)
+    running: Dict[asyncio.Task, str] = {}
+
+    async def timed(name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]], inputs: Dict[str, Any]) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return await func(inputs)
+        finally:
+            timings[name] = time.perf_counter() - start_time
+            logger.info(f"Stage {name} finished in {timings[name]:.2f}s")
+
+    try:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+            for name in ready:
+                func, _ = pending.pop(name)
+                running[asyncio.ensure_future(timed(name, func, dict(results)))] = name
+
+            if not running:
+                raise ValueError(f"Stages with unresolvable dependencies: {', '.join(pending)}")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                results[name] = task.result()
+    finally:
+        for task in running:
+            task.cancel()
+
+    return results, timings
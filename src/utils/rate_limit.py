@@ -0,0 +1,135 @@
+'''
+---------------------------------
+File: rate_limit.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import time
+import logging
+import threading
+
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers reserve
+    tokens up front (the balance may go negative) and wait for the returned delay, so
+    concurrent callers are queued in arrival order instead of spinning.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Maximum burst size. Defaults to max(rate, 1).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until `amount` tokens are available; returns the time waited"""
+        wait = self.reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (e.g. when a request cost less than estimated)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def limit_to(self, tokens: float) -> None:
+        """Lower the balance to an externally observed remaining count, never raising it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, tokens)
+
+    def configure(self, rate: Optional[float] = None, capacity: Optional[float] = None) -> None:
+        """Change the refill rate and/or burst size in place"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if rate and rate > 0:
+                self.rate = rate
+            if capacity and capacity > 0:
+                self.capacity = capacity
+                self._tokens = min(self._tokens, capacity)
+
+    @property
+    def available(self) -> float:
+        """Current token balance (negative while reservations are outstanding)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class HostLimiter:
+    """
+    Per-host concurrency and request-rate limits.
+
+    Usage:
+        with limiter.limit(host):
+            ...  # at most `concurrency` of these run per host, started at most `rps` per second
+
+    Args:
+        concurrency (int): Maximum in-flight requests per host.
+        rps (float): Maximum request starts per second per host.
+    """
+
+    def __init__(self, concurrency: int, rps: float):
+        self.concurrency = max(1, concurrency)
+        self.rps = rps
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def limit(self, host: str) -> "_HostSlot":
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.concurrency)
+                self._buckets[host] = TokenBucket(self.rps, capacity=1.0)
+            return _HostSlot(self._semaphores[host], self._buckets[host])
+
+
+class _HostSlot:
+    """Context manager holding one host slot"""
+
+    def __init__(self, semaphore: threading.BoundedSemaphore, bucket: TokenBucket):
+        self._semaphore = semaphore
+        self._bucket = bucket
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        try:
+            self._bucket.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._semaphore.release()
+        return False
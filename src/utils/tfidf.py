@@ -0,0 +1,242 @@
+'''
+---------------------------------
+File: tfidf.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import json
+import hashlib
+import logging
+import argparse
+import threading
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+from pathlib import Path
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from src.envs import TFIDF_CORPUS_DIRS, TFIDF_MODEL_PATH
+
+
+logger = logging.getLogger(__name__)
+
+CORPUS_EXTENSIONS = {".json", ".txt", ".md"}
+
+
+def load_corpus(directories: Iterable[Union[str, Path]]) -> List[str]:
+    """
+    Read reference documents from directories (recursively).
+
+    JSON files are serialized back to strings (a top-level list yields one document
+    per item), text and markdown files are read as-is.
+
+    Args:
+        directories (Iterable[Union[str, Path]]): Corpus directories, missing ones are skipped.
+
+    Returns:
+        List[str]: Documents in a stable order.
+    """
+    documents = []
+    for path in _corpus_files(directories):
+        try:
+            if path.suffix == ".json":
+                with open(path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                items = data if isinstance(data, list) else [data]
+                documents.extend(item if isinstance(item, str) else json.dumps(item) for item in items)
+            else:
+                documents.append(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"Skipping corpus file {path}: {e}")
+    return documents
+
+
+def corpus_fingerprint(directories: Iterable[Union[str, Path]]) -> str:
+    """Hash of corpus file names, sizes and modification times"""
+    digest = hashlib.sha256()
+    for path in _corpus_files(directories):
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _corpus_files(directories: Iterable[Union[str, Path]]) -> List[Path]:
+    files = []
+    for directory in directories:
+        directory = Path(directory)
+        if directory.is_dir():
+            files.extend(path for path in directory.rglob("*") if path.suffix in CORPUS_EXTENSIONS and path.is_file())
+    return sorted(files)
+
+
+class TfidfScorer:
+    """
+    TF-IDF model fitted on a reference corpus and reused for every comparison.
+
+    In "vocabulary" mode a regular TfidfVectorizer is fitted once. In "hashing" mode terms
+    are hashed into a fixed feature space and document frequencies are tracked directly,
+    so `partial_fit` can grow the model with new documents and unseen terms.
+
+    Args:
+        mode (str, optional): "vocabulary" or "hashing". Defaults to "vocabulary".
+        n_features (int, optional): Feature space size in hashing mode. Defaults to 2**20.
+    """
+
+    MODES = ("vocabulary", "hashing")
+
+    def __init__(self, mode: str = "vocabulary", n_features: int = 2 ** 20):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid TF-IDF mode: {mode}. Supported modes: {', '.join(self.MODES)}")
+
+        self.mode = mode
+        self.n_features = n_features
+        self.fingerprint: Optional[str] = None
+
+        self._vectorizer: Optional[TfidfVectorizer] = None
+        self._hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self._doc_freq = np.zeros(n_features, dtype=np.int64) if mode == "hashing" else None
+        self._n_docs = 0
+        self._idf: Optional[np.ndarray] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._n_docs > 0
+
+    def fit(self, documents: List[str]) -> "TfidfScorer":
+        """Fit the model from scratch on a corpus"""
+        if self.mode == "vocabulary":
+            self._vectorizer = TfidfVectorizer().fit(documents)
+            self._n_docs = len(documents)
+            return self
+
+        self._doc_freq[:] = 0
+        self._n_docs = 0
+        return self.partial_fit(documents)
+
+    def partial_fit(self, documents: List[str]) -> "TfidfScorer":
+        """Add documents to the document frequencies (hashing mode only)"""
+        if self.mode != "hashing":
+            raise ValueError("partial_fit is only supported in hashing mode")
+        if not documents:
+            return self
+
+        counts = self._hasher.transform(documents).tocsr()
+        counts.sum_duplicates()
+        self._doc_freq += np.bincount(counts.indices, minlength=self.n_features)
+        self._n_docs += len(documents)
+
+        # Same smoothed IDF as TfidfVectorizer
+        self._idf = np.log((1 + self._n_docs) / (1 + self._doc_freq)) + 1
+        return self
+
+    def transform(self, documents: List[str]) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows for documents"""
+        if not self.is_fitted:
+            raise ValueError("TfidfScorer is not fitted")
+        if self.mode == "vocabulary":
+            return self._vectorizer.transform(documents)
+
+        counts = self._hasher.transform(documents)
+        return normalize(counts.multiply(self._idf).tocsr(), norm="l2", copy=False)
+
+    def similarity(self, document1: str, document2: str) -> float:
+        """Cosine similarity of two documents in the fitted TF-IDF space"""
+        vectors = self.transform([document1, document2])
+        return float(vectors[0].multiply(vectors[1]).sum())
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Serialize the fitted model state"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({
+            "mode": self.mode,
+            "n_features": self.n_features,
+            "fingerprint": self.fingerprint,
+            "vectorizer": self._vectorizer,
+            "doc_freq": self._doc_freq,
+            "n_docs": self._n_docs,
+            "idf": self._idf,
+        }, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TfidfScorer":
+        """Load a model saved with `save`"""
+        state = joblib.load(path)
+        scorer = cls(mode=state["mode"], n_features=state["n_features"])
+        scorer.fingerprint = state["fingerprint"]
+        scorer._vectorizer = state["vectorizer"]
+        scorer._doc_freq = state["doc_freq"]
+        scorer._n_docs = state["n_docs"]
+        scorer._idf = state["idf"]
+        return scorer
+
+    @classmethod
+    def from_corpus(cls, directories: Iterable[Union[str, Path]] = TFIDF_CORPUS_DIRS, mode: str = "vocabulary") -> Optional["TfidfScorer"]:
+        """Fit a scorer on the reference corpus, None if the corpus is empty"""
+        directories = list(directories)
+        documents = load_corpus(directories)
+        if not documents:
+            return None
+
+        scorer = cls(mode=mode).fit(documents)
+        scorer.fingerprint = corpus_fingerprint(directories)
+        logger.info(f"Fitted {mode} TF-IDF model on {len(documents)} reference documents")
+        return scorer
+
+
+_default_scorer: Dict[str, Any] = {}
+_default_scorer_lock = threading.Lock()
+
+
+def get_default_scorer(model_path: Union[str, Path] = TFIDF_MODEL_PATH) -> Optional[TfidfScorer]:
+    """
+    Lazily load (or fit and save) the TF-IDF model for the reference corpus.
+
+    The serialized model is refitted when the corpus changes. Returns None when no
+    reference corpus is available, in which case callers fall back to fitting on the
+    compared documents.
+    """
+    with _default_scorer_lock:
+        if "scorer" in _default_scorer:
+            return _default_scorer["scorer"]
+
+        fingerprint = corpus_fingerprint(TFIDF_CORPUS_DIRS)
+        scorer = None
+        model_path = Path(model_path)
+        if model_path.exists():
+            try:
+                scorer = TfidfScorer.load(model_path)
+                if scorer.fingerprint != fingerprint:
+                    logger.info("Reference corpus changed, refitting TF-IDF model")
+                    scorer = None
+            except Exception as e:
+                logger.warning(f"Failed to load TF-IDF model from {model_path}: {e}")
+                scorer = None
+
+        if scorer is None:
+            scorer = TfidfScorer.from_corpus(TFIDF_CORPUS_DIRS)
+            if scorer is not None:
+                scorer.save(model_path)
+
+        _default_scorer["scorer"] = scorer
+        return scorer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the reference TF-IDF model")
+    parser.add_argument("--mode", type=str, default="vocabulary", choices=TfidfScorer.MODES)
+    parser.add_argument("--output", type=str, default=str(TFIDF_MODEL_PATH))
+    args = parser.parse_args()
+
+    fitted = TfidfScorer.from_corpus(TFIDF_CORPUS_DIRS, mode=args.mode)
+    if fitted:
+        fitted.save(args.output)
+        print(f"Saved {args.mode} TF-IDF model to {args.output}")
+    else:
+        print(f"No reference documents found in {', '.join(str(d) for d in TFIDF_CORPUS_DIRS)}")
@@ -11,6 +11,7 @@ import re
 import time
 import json
 import base64
+import asyncio
 import logging
 import subprocess
 import functools
@@ -64,6 +65,16 @@ def escape_curly_braces(text):
 # Decorators
 def timer_decoder(func: Callable) -> Callable:
     """Measure execution time of functions"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.time()
+            result = await func(*args, **kwargs)
+            end_time = time.time()
+            logger.debug(f"Function {func.__name__} took {end_time - start_time:.2f} seconds to run")
+            return result
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
@@ -75,6 +86,16 @@ def timer_decoder(func: Callable) -> Callable:
 
 def error_handler(func: Callable) -> Callable:
     """Handle exceptions in functions"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error in {func.__name__}: {str(e)}")
+                return None
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
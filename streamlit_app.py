@@ -28,6 +28,7 @@ logger = logging.getLogger(__name__)
 # Import AdaptiveCV
 try:
     from src import AdaptiveCV
+    from src.envs import LLM_BASE_URL
     logger.info("Successfully imported AdaptiveCV")
 except ImportError as e:
     logger.error(f"Failed to import AdaptiveCV: {e}")
@@ -152,29 +153,14 @@ def display_pdf(pdf_path):
 def calculate_metrics(resume_details, user_data, job_details):
     """Calculate similarity metrics for resume, user data, and job description."""
     try:
-        from src.utils.metrics import (
-            jaccard_similarity, 
-            overlap_coefficient, 
-            cosine_similarity
+        from src.utils.metrics import calculate_all_metrics
+
+        return calculate_all_metrics(
+            resume_details,
+            user_data,
+            job_details,
+            metrics=["overlap_coefficient", "cosine_similarity", "jaccard_similarity"]
         )
-        
-        metrics = {}
-        for metric_name, metric_func in [
-            ("Overlap Coefficient", overlap_coefficient), 
-            ("Cosine Similarity", cosine_similarity),
-            ("Jaccard Similarity", jaccard_similarity)
-        ]:
-            user_personalization = metric_func(json.dumps(resume_details), json.dumps(user_data))
-            job_alignment = metric_func(json.dumps(resume_details), json.dumps(job_details))
-            job_match = metric_func(json.dumps(user_data), json.dumps(job_details))
-            
-            metrics[metric_name] = {
-                "user_personalization": user_personalization,
-                "job_alignment": job_alignment,
-                "job_match": job_match
-            }
-            
-        return metrics
     except Exception as e:
         logger.error(f"Error calculating metrics: {e}")
         return None
@@ -358,7 +344,8 @@ def main():
             
             if provider != "Ollama" and not api_key:
                 api_key = os.getenv(f"{provider.upper()}_API_KEY")
-                if not api_key:
+                # A custom endpoint (e.g. the local fake server) does not need a real key
+                if not api_key and not LLM_BASE_URL:
                     st.error(f"Please provide an API key for {provider}")
                     st.stop()
             
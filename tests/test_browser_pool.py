@@ -0,0 +1,107 @@
+'''
+---------------------------------
+File: test_browser_pool.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import time
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+
+from src.utils.browser_pool import BLOCKED_URL_PATTERNS, BrowserPool
+
+PAGES = {
+    "/": ("text/html", """<html><head>
+        <link rel="stylesheet" href="/style.css">
+        <script src="/app.js"></script>
+        <script src="/tracker.js"></script>
+        </head><body>
+        <nav>Site navigation</nav>
+        <main>Senior Python Engineer</main>
+        <img src="/logo.png">
+        </body></html>"""),
+    "/style.css": ("text/css", "main { color: black; }"),
+    "/app.js": ("application/javascript", "window.loaded = true;"),
+    "/tracker.js": ("application/javascript", "window.tracked = true;"),
+    "/logo.png": ("image/png", ""),
+    # Loads normally, then blocks the page's main thread so reading the text never finishes
+    "/hang": ("text/html", """<html><body>Loading
+        <script>document.addEventListener("DOMContentLoaded", () => setTimeout(() => { while (true) {} }, 0));</script>
+        </body></html>"""),
+}
+
+
+@pytest.fixture(scope="module")
+def site():
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            content_type, body = PAGES.get(self.path, ("text/plain", "not found"))
+            data = body.encode("utf-8")
+            self.send_response(200 if self.path in PAGES else 404)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    host, port = httpd.server_address[:2]
+    yield f"http://{host}:{port}", requested
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = BrowserPool(size=1, page_timeout=5, blocked_url_patterns=BLOCKED_URL_PATTERNS + ("/tracker",))
+    try:
+        pool._ensure_started()
+    except Exception as e:
+        pytest.skip(f"Chromium is not available: {str(e).splitlines()[0]}")
+    yield pool
+    pool.close()
+
+
+def test_fetch_text_reads_rendered_body(site, pool):
+    base_url, _ = site
+    text = pool.fetch_text(f"{base_url}/", remove_selectors=["nav"])
+    assert "Senior Python Engineer" in text
+    assert "Site navigation" not in text
+
+
+def test_blocked_resources_never_reach_the_server(site, pool):
+    base_url, requested = site
+    requested.clear()
+    pool.fetch_text(f"{base_url}/")
+
+    assert "/" in requested
+    assert "/app.js" in requested
+    for path in ("/style.css", "/logo.png", "/tracker.js"):
+        assert path not in requested
+
+
+def test_timed_out_fetch_is_cancelled_and_releases_its_context(site, pool):
+    base_url, _ = site
+    assert pool.fetch_text(f"{base_url}/hang", timeout=0.5) is None
+
+    deadline = time.monotonic() + 10
+    while pool._contexts.qsize() < pool.size and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert pool._contexts.qsize() == pool.size
+
+    # The single context is usable again
+    assert "Senior Python Engineer" in pool.fetch_text(f"{base_url}/")
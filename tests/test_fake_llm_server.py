@@ -0,0 +1,29 @@
+'''
+---------------------------------
+File: test_fake_llm_server.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import pytest
+
+from langchain_core.output_parsers import JsonOutputParser
+
+from src.utils.fake_llm_server import KNOWN_SCHEMAS, canned_json, example_value
+
+
+@pytest.mark.parametrize("model", list(KNOWN_SCHEMAS.values()), ids=lambda model: model.__name__)
+def test_canned_json_validates(model):
+    prompt = f"Fill in the fields.\n{JsonOutputParser(pydantic_object=model).get_format_instructions()}"
+    model.model_validate(canned_json(prompt))
+
+
+def test_all_of_resolves_like_ref():
+    defs = {"Link": {"type": "object", "properties": {"url": {"type": "string"}}}}
+    schema = {"allOf": [{"$ref": "#/$defs/Link"}], "description": "Profile links"}
+    assert example_value(schema, defs, "media_profiles") == {"url": "https://example.com/url"}
+
+
+def test_canned_json_without_schema():
+    assert canned_json("Write a cover letter.") == {"result": "Sample result"}
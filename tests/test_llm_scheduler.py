@@ -0,0 +1,99 @@
+'''
+---------------------------------
+File: test_llm_scheduler.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import random
+
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+import pytest
+
+from src.utils.fake_llm_server import FakeLLMServer
+from src.utils.llm_scheduler import RequestScheduler
+
+REQUEST = {"model": "fake", "messages": [{"role": "user", "content": "Write a cover letter."}], "max_tokens": 50}
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def start(**kwargs) -> FakeLLMServer:
+        server = FakeLLMServer(seed=7, **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def send_for(server: FakeLLMServer):
+    # The scheduler owns retries, so the client must not retry on its own
+    client = openai.OpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    return client.chat.completions.with_raw_response.create
+
+
+def test_rate_limited_requests_retry_with_jittered_backoff(server_factory):
+    server = server_factory(rate_limit_rate=0.5, retry_after=0.0)
+    scheduler = RequestScheduler(max_retries=20, backoff_base=0.01, backoff_max=0.05)
+    send = send_for(server)
+
+    for _ in range(10):
+        assert scheduler.call(send, REQUEST, estimated_tokens=100).choices[0].message.content
+
+    assert server.stats["rate_limited"] > 0
+    assert scheduler.stats["retries"] == server.stats["rate_limited"]
+    assert scheduler.stats["requests"] == server.stats["chat"] == 10
+
+
+def test_backoff_is_full_jitter():
+    scheduler = RequestScheduler(backoff_base=1.0, backoff_max=8.0)
+    random.seed(0)
+    for attempt, ceiling in enumerate([1.0, 2.0, 4.0, 8.0, 8.0]):
+        delays = [scheduler.backoff(attempt) for _ in range(50)]
+        assert all(0.0 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_requests_queue_instead_of_being_dropped(server_factory):
+    server = server_factory()
+    scheduler = RequestScheduler(max_retries=0)
+    scheduler.requests.configure(rate=40.0, capacity=2)
+    send = send_for(server)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: scheduler.call(send, REQUEST, estimated_tokens=100), range(10)))
+
+    assert len(results) == 10
+    assert server.stats["chat"] == 10
+    assert scheduler.stats["throttled_seconds"] > 0
+
+
+def test_rate_limited_attempt_refunds_its_reservation(server_factory):
+    server = server_factory(rate_limit_rate=1.0, retry_after=0.0)
+    scheduler = RequestScheduler(max_retries=0)
+    scheduler.requests.configure(rate=0.001, capacity=1)
+
+    with pytest.raises(openai.RateLimitError):
+        scheduler.call(send_for(server), REQUEST, estimated_tokens=100)
+
+    assert scheduler.requests.reserve(1) == 0.0
+
+
+def test_buckets_adapt_to_rate_limit_headers(server_factory):
+    server = server_factory(rpm=120, tpm=30_000)
+    scheduler = RequestScheduler(rpm=10_000, tpm=10_000_000)
+
+    scheduler.call(send_for(server), REQUEST, estimated_tokens=100)
+
+    assert scheduler.requests.capacity == 120
+    assert scheduler.requests.rate == pytest.approx(2.0)
+    assert scheduler.tokens.capacity == 30_000
+    assert scheduler.tokens.rate == pytest.approx(500.0)
+    assert scheduler.requests.available <= server.requests.available + 1
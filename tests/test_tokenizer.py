@@ -0,0 +1,63 @@
+'''
+---------------------------------
+File: test_tokenizer.py
+Author: Ulugbek Shernazarov
+Email: u.shernaz4rov@gmail.com
+Copyright (c) 2025 Ulugbek Shernazarov. All rights reserved | GitHub: eracoding
+---------------------------------
+'''
+import json
+import functools
+
+from pathlib import Path
+
+import pytest
+
+from nltk.tokenize import word_tokenize
+
+from src.utils import metrics
+
+DEMO_PROFILE = Path(__file__).resolve().parents[1] / "src" / "demo" / "user_profile.json"
+
+
+@pytest.fixture(autouse=True)
+def line_tokenizer(monkeypatch):
+    """Reference word_tokenize without sentence splitting, so punkt data is not needed"""
+    monkeypatch.setattr(metrics, "word_tokenize", functools.partial(word_tokenize, preserve_line=True))
+
+
+EDGE_CASES = {
+    "contractions": "I don't know why we can't ship it; she'd say they're fine, you've seen John's CI/CD and we'll see.",
+    "double_quotes": 'He said "ship it" and then "wait" -- "really"?',
+    "single_quotes": "The 'legacy' system and the 'new' one's API",
+    "smart_quotes": "Described as “fast” and ‘reliable’ by the team’s lead",
+    "ellipses": "Wait... what? It went on...and on... forever",
+    "double_dashes": "Python--Go -- Rust---C, state-of-the-art work",
+    "multiword_contractions": "I cannot say; you wanna go? gimme lemme gonna gotta d'ye more'n",
+    "leading_apostrophe": "'Tis the season, 'twas fine ('tis) x'tis",
+    "asterisks": "Python*Go, C* and *args",
+    "dot_runs": "wait..then.... done. ..ok",
+    "mixed": "C++ & Python (3.11); e-mail: a@b.com -- $1,000 at 10:30... U.S.A. ratio 3:1, a:b",
+}
+
+
+def assert_parity(text: str) -> None:
+    fast = metrics.tokenize_and_stem(text)
+    reference = metrics.tokenize_and_stem_nltk(text)
+    assert fast == reference
+
+
+@pytest.mark.parametrize("text", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_tokenize_and_stem_matches_nltk(text):
+    assert_parity(text)
+
+
+@pytest.mark.parametrize("indent", [None, 2], ids=["compact", "indented"])
+def test_tokenize_and_stem_matches_nltk_on_demo_profile(indent):
+    profile = json.loads(DEMO_PROFILE.read_text(encoding="utf-8"))
+    assert_parity(json.dumps(profile, indent=indent))
+
+
+def test_normalize_text_uses_fast_path():
+    text = EDGE_CASES["contractions"]
+    assert metrics.normalize_text(text) == metrics.tokenize_and_stem_nltk(text)